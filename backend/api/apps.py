@@ -1,6 +1,27 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        if settings.RATES_REFRESHER_ENABLED and self._is_serving():
+            from .v1.services import start_rate_refresher
+            start_rate_refresher()
+
+    @staticmethod
+    def _is_serving() -> bool:
+        """
+        Метод для проверки, что процесс обслуживает запросы, а не выполняет служебную команду manage.py
+        (migrate, collectstatic и т.п.) или является наблюдающим процессом автоперезагрузки runserver.
+        """
+        if os.path.basename(sys.argv[0]) != 'manage.py':
+            return True
+        if len(sys.argv) < 2 or sys.argv[1] != 'runserver':
+            return False
+        return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
@@ -0,0 +1,41 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.v1.services import BulkConverter, CurrencyService, CurrencyServiceException, open_text
+
+
+class Command(BaseCommand):
+    help = "Конвертирует файл CSV (колонки from,to,value) или NDJSON построчно, не загружая его в память целиком."
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help="Путь к исходному файлу или '-' для чтения из stdin.")
+        parser.add_argument('output', help="Путь к файлу результата или '-' для вывода в stdout.")
+        parser.add_argument('--format', choices=['csv', 'ndjson'], default=None,
+                            help="Формат файла. По умолчанию определяется по расширению.")
+
+    def handle(self, *args, **options):
+        source = options['input']
+        target = options['output']
+
+        try:
+            fmt = BulkConverter.detect_format(filename=source, fmt=options['format'])
+            lines = open_text(sys.stdin.buffer) if source == '-' else open(source, encoding='utf-8-sig', newline='')
+            with lines:
+                rows = BulkConverter(currency_service=CurrencyService()).convert(lines=lines, fmt=fmt)
+                out = sys.stdout if target == '-' else open(target, 'w', encoding='utf-8', newline='')
+                try:
+                    count = 0
+                    for row in rows:
+                        out.write(row)
+                        count += 1
+                finally:
+                    if out is not sys.stdout:
+                        out.close()
+        except CurrencyServiceException as e:
+            raise CommandError(e.detail['message'])
+        except OSError as e:
+            raise CommandError(f"Ошибка чтения или записи файла: {e}")
+
+        if target != '-':
+            self.stdout.write(self.style.SUCCESS(f"Записано строк: {count}"))
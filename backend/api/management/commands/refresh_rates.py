@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.v1.services import CurrencyServiceException, RateRefresher, get_rate_engine
+from api.v1.services.snapshots import save_snapshot
+
+
+class Command(BaseCommand):
+    help = "Обновляет таблицу курсов валют по расписанию (или однократно с флагом --once)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Загрузить таблицу курсов один раз и завершиться.")
+        parser.add_argument('--interval', type=float, default=None, help="Период обновления в секундах.")
+
+    def handle(self, *args, **options):
+        engine = get_rate_engine()
+        on_refresh = save_snapshot if settings.RATES_SNAPSHOTS_ENABLED else None
+
+        if options['once']:
+            try:
+                table = engine.refresh(force=True)
+            except CurrencyServiceException as e:
+                raise CommandError(f"Не удалось обновить курсы: {e}")
+            if on_refresh is not None:
+                on_refresh(table.base, table.rates, table.fetched_at)
+            self.stdout.write(self.style.SUCCESS(f"Загружено курсов: {len(table.rates)} (база {table.base})"))
+            return
+
+        refresher = RateRefresher(engine=engine, interval=options['interval'], on_refresh=on_refresh)
+        self.stdout.write(f"Обновление курсов каждые {refresher.interval} с. Для остановки нажмите Ctrl+C.")
+        refresher.start()
+        try:
+            while refresher.is_alive():
+                refresher.join(timeout=1)
+        except KeyboardInterrupt:
+            refresher.stop()
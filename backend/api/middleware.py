@@ -0,0 +1,48 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .v1.services.metrics import REGISTRY, REQUEST_DURATION, REQUESTS
+
+
+class MetricsMiddleware:
+    """
+    Middleware, которое считает запросы и время их обработки по маршрутам (метрики /metrics).
+
+    Метка endpoint — шаблон маршрута (api/rates/), а не путь запроса, чтобы число рядов не росло
+    с параметрами. Работает и в синхронном, и в асинхронном режиме, поэтому асинхронные представления
+    не переключаются в поток. Для потоковых ответов учитывается время до начала передачи тела.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self._record(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self._record(request, response, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def _record(request, response, duration: float):
+        match = request.resolver_match
+        endpoint = match.route if match is not None else 'unmatched'
+        REQUESTS.inc(endpoint, request.method, str(response.status_code))
+        REQUEST_DURATION.observe(duration, endpoint)
+        REGISTRY.maybe_flush()
@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RateSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base', models.CharField(max_length=3, verbose_name='Базовая валюта')),
+                ('fetched_at', models.DateTimeField(verbose_name='Время загрузки')),
+                ('codes', models.TextField(verbose_name='Коды валют')),
+                ('rates', models.BinaryField(verbose_name='Курсы (float64)')),
+            ],
+            options={
+                'verbose_name': 'Снимок курсов',
+                'verbose_name_plural': 'Снимки курсов',
+                'constraints': [models.UniqueConstraint(fields=('base', 'fetched_at'), name='rate_snapshot_base_fetched_at')],
+            },
+        ),
+    ]
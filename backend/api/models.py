@@ -0,0 +1,46 @@
+from array import array
+
+from django.db import models
+
+
+class RateSnapshot(models.Model):
+    """
+    Снимок таблицы курсов относительно базовой валюты на момент загрузки.
+
+    Курсы хранятся одной строкой: коды валют подряд по 3 символа и упакованный вектор float64
+    в том же порядке, поэтому таблица из ~160 валют занимает около 1,8 КБ.
+    """
+    base = models.CharField(max_length=3, verbose_name='Базовая валюта')
+    fetched_at = models.DateTimeField(verbose_name='Время загрузки')
+    codes = models.TextField(verbose_name='Коды валют')
+    rates = models.BinaryField(verbose_name='Курсы (float64)')
+
+    class Meta:
+        verbose_name = 'Снимок курсов'
+        verbose_name_plural = 'Снимки курсов'
+        constraints = [
+            models.UniqueConstraint(fields=['base', 'fetched_at'], name='rate_snapshot_base_fetched_at'),
+        ]
+
+    def __str__(self):
+        return f'{self.base} {self.fetched_at:%Y-%m-%d %H:%M:%S}'
+
+    @classmethod
+    def pack(cls, rates: dict) -> tuple:
+        """
+        Метод для упаковки словаря курсов.
+        :param rates: Словарь {код валюты: курс}.
+        :return: Кортеж (codes, rates) для полей модели.
+        """
+        codes = [code for code in rates if len(code) == 3]
+        return ''.join(codes), array('d', (rates[code] for code in codes)).tobytes()
+
+    def unpack(self) -> dict:
+        """
+        Метод для распаковки курсов снимка.
+        :return: Словарь {код валюты: курс}.
+        """
+        values = array('d')
+        values.frombytes(bytes(self.rates))
+        codes = self.codes
+        return {codes[i * 3:i * 3 + 3]: value for i, value in enumerate(values)}
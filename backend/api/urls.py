@@ -3,9 +3,12 @@ from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 from django.views.generic.base import RedirectView
 
+from .v1.views.metrics_views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('api.v1.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
 
 urlpatterns += [
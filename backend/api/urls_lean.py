@@ -0,0 +1,11 @@
+from django.urls import include, path
+
+from .v1.views.metrics_views import MetricsView
+from .v1.views.schema_views import StaticSchemaView
+
+# Маршруты облегчённого профиля (backend.settings_lean): только API, метрики и готовая схема OpenAPI
+urlpatterns = [
+    path('api/', include('api.v1.urls')),
+    path('metrics', MetricsView.as_view(), name='metrics'),
+    path('docs/schema/', StaticSchemaView.as_view(), name='schema'),
+]
@@ -0,0 +1,20 @@
+import msgpack
+from rest_framework.renderers import BaseRenderer
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Рендерер ответа в формате MessagePack.
+
+    Выбирается заголовком Accept: application/msgpack или параметром format=msgpack. Ответ компактнее JSON
+    и сериализуется быстрее, что заметно на больших ответах (например, матрице конвертации во все валюты).
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, use_bin_type=True)
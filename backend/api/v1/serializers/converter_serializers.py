@@ -1,9 +1,32 @@
+from django.conf import settings
+from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 
 
+def amount_field(**kwargs) -> serializers.DecimalField:
+    """Поле суммы в ответе: десятичная строка с числом знаков валюты (см. money.format_amount)."""
+    return serializers.DecimalField(max_digits=None, decimal_places=None, coerce_to_string=True, **kwargs)
+
+
 class GetRatesSerializer(serializers.Serializer):
     """Сериализатор для формата ответа API, который возвращает конвертированную валюту."""
-    result = serializers.FloatField()
+    result = amount_field(help_text="Конвертированная сумма, округлённая до минорных единиц валюты назначения.")
+    stale = serializers.BooleanField(
+        required=False,
+        help_text="Присутствует, если сторонний сервис недоступен и сумма вычислена по последней сохранённой таблице курсов."
+    )
+
+
+class MatrixResponseSerializer(serializers.Serializer):
+    """Сериализатор ответа конвертации одной суммы во многие валюты."""
+    results = serializers.DictField(
+        child=amount_field(allow_null=True),
+        help_text="Суммы по кодам валют назначения в порядке запроса; null, если курса валюты нет в таблице."
+    )
+    stale = serializers.BooleanField(
+        required=False,
+        help_text="Присутствует, если сторонний сервис недоступен и суммы вычислены по последней сохранённой таблице курсов."
+    )
 
 
 class ErrorDetailSerializer(serializers.Serializer):
@@ -15,3 +38,48 @@ class ErrorDetailSerializer(serializers.Serializer):
 class ErrorResponseSerializer(serializers.Serializer):
     """Сериализатор для универсального ответа на ошибку."""
     detail = ErrorDetailSerializer(help_text="Подробная информация об ошибке.")
+
+
+class BatchItemSerializer(serializers.Serializer):
+    """Сериализатор элемента пакетной конвертации (поле from объявлено в get_fields, т.к. это ключевое слово)."""
+    to = serializers.CharField(help_text="Код валюты, в которую конвертируем.")
+    value = serializers.FloatField(help_text="Сумма для конвертации.")
+
+    def get_fields(self):
+        return {'from': serializers.CharField(help_text="Код валюты, из которой конвертируем."), **super().get_fields()}
+
+
+@extend_schema_field(BatchItemSerializer(many=True))
+class BatchItemsField(serializers.ListField):
+    """
+    Поле списка элементов пакета. В схеме OpenAPI элементы описаны BatchItemSerializer,
+    а проверяет их по отдельности сервис, чтобы ошибка в одном элементе не отклоняла весь пакет.
+    """
+
+
+class BatchRequestSerializer(serializers.Serializer):
+    """
+    Сериализатор тела запроса пакетной конвертации.
+    Элементы проверяются по отдельности сервисом, чтобы ошибка в одном не отклоняла весь пакет.
+    """
+    items = BatchItemsField(
+        allow_empty=False,
+        max_length=settings.RATES_BATCH_MAX_ITEMS,
+        help_text="Список элементов {from, to, value}."
+    )
+
+
+class BatchResultSerializer(serializers.Serializer):
+    """Сериализатор результата одного элемента: сумма или ошибка."""
+    result = amount_field(required=False, help_text="Конвертированная сумма.")
+    detail = ErrorDetailSerializer(required=False, help_text="Ошибка конвертации элемента.")
+
+
+class BatchResponseSerializer(serializers.Serializer):
+    """Сериализатор ответа пакетной конвертации."""
+    results = BatchResultSerializer(many=True, help_text="Результаты в порядке элементов запроса.")
+
+
+class CurrenciesSerializer(serializers.Serializer):
+    """Сериализатор списка доступных валют."""
+    currencies = serializers.ListField(child=serializers.CharField(), help_text="Коды валют в алфавитном порядке.")
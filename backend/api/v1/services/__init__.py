@@ -0,0 +1,11 @@
+from .async_currency import AsyncCurrencyService
+from .async_provider import AsyncExchangeRateClient
+from .bulk import BulkConverter, open_text
+from .currency import CurrencyService
+from .exceptions import CurrencyServiceException
+from .rate_table import RateRefresher, RateTable, RateTableEngine, get_rate_engine, start_rate_refresher
+
+__all__ = [
+    'AsyncCurrencyService', 'AsyncExchangeRateClient', 'BulkConverter', 'CurrencyService', 'CurrencyServiceException',
+    'RateRefresher', 'RateTable', 'RateTableEngine', 'get_rate_engine', 'open_text', 'start_rate_refresher',
+]
@@ -0,0 +1,89 @@
+import asyncio
+import weakref
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync, sync_to_async
+
+from .async_provider import AsyncExchangeRateClient
+from .currency import CurrencyService
+from .exceptions import CurrencyServiceException
+from .money import convert_amount, parse_amount
+from .providers import get_provider_chain
+from .rate_table import RateTable, RateTableEngine
+from .shared_store import LocalRateStore
+
+# Загрузки таблицы, которые выполняются в цикле событий: {цикл: {базовая валюта: задача}}
+_loads = weakref.WeakKeyDictionary()
+
+
+class AsyncCurrencyService(CurrencyService):
+    """
+    Асинхронный вариант CurrencyService.
+
+    Таблица курсов общая с синхронным сервисом (тот же движок и общее хранилище). Если в памяти есть
+    пригодная таблица, конвертация выполняется без ввода-вывода; иначе берётся таблица другого воркера
+    из общего хранилища или таблица загружается асинхронно (провайдеры settings.RATES_PROVIDERS).
+    Одновременные запросы в одном цикле событий ждут одну и ту же загрузку, а между воркерами её выполняет
+    один ведущий (см. RateTableEngine.arefresh). С переданным client, как и в CurrencyService,
+    таблица хранится только в памяти сервиса.
+
+    Асинхронные методы названы с префиксом a (aget_table, aget_rate, aconvert), а унаследованные синхронные
+    методы работают так же, как в CurrencyService.
+    """
+
+    def __init__(self, client: AsyncExchangeRateClient = None, engine: RateTableEngine = None):
+        if engine is None and client is not None:
+            # Синхронные методы сервиса загружают таблицу тем же клиентом
+            engine = RateTableEngine(fetcher=async_to_sync(client.latest), store=LocalRateStore())
+        super().__init__(engine=engine)
+        self.client = client
+
+    async def aget_table(self) -> RateTable:
+        """
+        Метод для получения таблицы курсов без блокировки цикла событий.
+        :return: Объект RateTable.
+        """
+        if self.engine.restorer is not None:
+            # Первое обращение может прочитать сохранённый снимок из БД, это синхронная операция
+            table = await sync_to_async(self.engine.peek)()
+        else:
+            table = self.engine.peek()
+        if table is not None:
+            return table
+
+        loop = asyncio.get_running_loop()
+        loads = _loads.setdefault(loop, {})
+        task = loads.get(self.engine.base)
+        if task is None:
+            task = loads[self.engine.base] = loop.create_task(self._load())
+            task.add_done_callback(lambda _: loads.pop(self.engine.base, None))
+        return await asyncio.shield(task)
+
+    async def aget_rate(self, from_currency: str, to_currency: str) -> float:
+        """
+        Метод для получения курса обмена валютной пары.
+        :param from_currency: Название валюты, из которой конвертируем (строка).
+        :param to_currency: Название валюты, в которую конвертируем (строка).
+        :return: Курс обмена (float) между from_currency и to_currency.
+        """
+        table = await self.aget_table()
+        return table.cross_rate(from_currency.upper(), to_currency.upper())
+
+    async def aconvert(self, from_currency: str, to_currency: str, value: Decimal, table: RateTable = None) -> Decimal:
+        """
+        Метод для конвертации суммы из одной валюты в другую.
+        :param from_currency: Название валюты, из которой конвертируем (строка).
+        :param to_currency: Название валюты, в которую конвертируем (строка).
+        :param value: Сумма для конвертации (Decimal).
+        :param table: Уже полученная таблица курсов (см. aget_table).
+        :return: Конвертированная сумма (Decimal), округлённая до минорных единиц to_currency.
+        """
+        table = table or await self.aget_table()
+        return convert_amount(table, from_currency.upper(), to_currency.upper(), parse_amount(value))
+
+    async def _load(self) -> RateTable:
+        fetcher = self.client.latest if self.client is not None else get_provider_chain().alatest
+        try:
+            return await self.engine.arefresh(fetcher)
+        except CurrencyServiceException as e:
+            return self.engine.stale_fallback(e)
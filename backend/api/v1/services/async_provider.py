@@ -0,0 +1,148 @@
+import asyncio
+import logging
+import time
+import weakref
+
+import httpx
+from django.conf import settings
+from rest_framework import status
+
+from .circuit_breaker import CircuitBreaker, get_circuit_breaker
+from .exceptions import CurrencyServiceException
+from .metrics import UPSTREAM_DURATION
+from .provider import check_result, parse_latest, retry_statuses
+from .rate_budget import RequestBudget, get_request_budget
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncExchangeRateClient:
+    """
+    Асинхронный клиент стороннего сервиса курсов валют на httpx с пулом keep-alive соединений.
+
+    Ожидание ответа не занимает поток, поэтому один процесс держит тысячи одновременных запросов,
+    даже когда сторонний сервис отвечает медленно. Настройки пула, таймаутов и повторов те же,
+    что у ExchangeRateClient (PROVIDER_*), автомат защиты и бюджет запросов общие с ним.
+    """
+
+    def __init__(self, base_url: str = None, api_key: str = None, pool_size: int = None,
+                 connect_timeout: float = None, read_timeout: float = None, retries: int = None,
+                 backoff_factor: float = None, client: httpx.AsyncClient = None, breaker: CircuitBreaker = None,
+                 budget: RequestBudget = None):
+        self.base_url = (base_url or settings.BASE_URL).rstrip('/')
+        self.api_key = settings.API_KEY if api_key is None else api_key
+        self.retries = settings.PROVIDER_RETRIES if retries is None else retries
+        self.backoff_factor = settings.PROVIDER_BACKOFF_FACTOR if backoff_factor is None else backoff_factor
+        self.breaker = breaker or get_circuit_breaker()
+        self.budget = budget or get_request_budget()
+        self.retry_statuses = retry_statuses(self.budget)
+        read_timeout = settings.PROVIDER_READ_TIMEOUT if read_timeout is None else read_timeout
+        self.client = client or httpx.AsyncClient(
+            timeout=httpx.Timeout(
+                read_timeout,
+                connect=settings.PROVIDER_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.PROVIDER_POOL_SIZE if pool_size is None else pool_size,
+                max_keepalive_connections=settings.PROVIDER_POOL_SIZE if pool_size is None else pool_size
+            ),
+        )
+
+    async def latest(self, base_currency: str) -> dict:
+        """
+        Метод для запроса полной таблицы курсов относительно базовой валюты.
+        :param base_currency: Код базовой валюты (строка).
+        :return: Словарь {код валюты: курс} относительно base_currency.
+        """
+        return parse_latest(await self._get(f"latest/{base_currency}"), base_currency)
+
+    async def aclose(self):
+        """Метод для закрытия соединений пула."""
+        await self.client.aclose()
+
+    async def _get(self, path: str) -> dict:
+        # Запрос проходит через автомат защиты и бюджет запросов; сбоем считается всё, кроме ответа 4xx (кроме 429)
+        self.breaker.before_call()
+        try:
+            self.budget.acquire()
+        except CurrencyServiceException:
+            self.breaker.cancel()
+            raise
+
+        try:
+            data = await self._request(path)
+        except CurrencyServiceException as e:
+            if 400 <= e.status_code < 500 and e.status_code != 429:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return data
+
+    def _charge_retry(self) -> bool:
+        """Списание повтора из бюджета запросов (первая попытка списывается в _get); False — повторять нельзя."""
+        try:
+            self.budget.acquire()
+        except CurrencyServiceException:
+            return False
+        return True
+
+    async def _request(self, path: str) -> dict:
+        url = f"{self.base_url}/{self.api_key}/{path}"
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            for attempt in range(self.retries + 1):
+                last_attempt = attempt == self.retries
+                try:
+                    response = await self.client.get(url)
+                    outcome = str(response.status_code)
+                    if response.status_code in self.retry_statuses and not last_attempt and self._charge_retry():
+                        await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+                        continue
+                    response.raise_for_status()  # Проверка на ошибки HTTP
+                    return check_result(response.json())
+
+                except CurrencyServiceException:
+                    raise
+
+                except httpx.HTTPStatusError as e:
+                    logger.error(f"HTTP error from external API: {e}")
+                    raise CurrencyServiceException(
+                        status_code=e.response.status_code,
+                        detail=f"Ошибка при извлечении данных из внешнего API: {e}"
+                    )
+
+                except httpx.TransportError as e:
+                    outcome = 'error'
+                    if not last_attempt and self._charge_retry():
+                        await asyncio.sleep(self.backoff_factor * 2 ** attempt)
+                        continue
+                    logger.error(f"Currency service unavailable: {e}")
+                    raise CurrencyServiceException(
+                        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                        detail=f"Услуга обмена валюты недоступна. Пожалуйста, повторите попытку позже."
+                    )
+
+                except Exception as e:
+                    logger.error(f"An unexpected error occurred: {e}")
+                    raise CurrencyServiceException(
+                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                        detail=f"Произошла непредвиденная ошибка. Пожалуйста, повторите попытку позже."
+                    )
+        finally:
+            UPSTREAM_DURATION.observe(time.perf_counter() - started, path.split('/', 1)[0], outcome)
+
+
+# Пул httpx привязан к циклу событий, поэтому клиент создаётся для каждого цикла
+_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_provider_client() -> AsyncExchangeRateClient:
+    """Функция для получения клиента стороннего сервиса, общего для текущего цикла событий."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _clients[loop] = AsyncExchangeRateClient()
+    return client
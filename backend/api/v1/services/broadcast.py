@@ -0,0 +1,211 @@
+import asyncio
+import collections
+import threading
+
+from django.conf import settings
+from rest_framework import status
+
+from .currencies import normalize, not_found_message
+from .exceptions import CurrencyServiceException
+from .metrics import Gauge
+from .rate_table import RateTable, RateTableEngine, get_rate_engine
+
+
+def parse_pairs(value) -> tuple:
+    """
+    Функция для разбора списка валютных пар потока курсов.
+    :param value: Строка вида "USD/EUR,EUR/GBP" (регистр не важен).
+    :return: Кортеж пар (from, to) без повторов, в порядке запроса.
+    :raises CurrencyServiceException: 400, если список пуст, слишком длинный или содержит неизвестную валюту.
+    """
+    if not value or not isinstance(value, str):
+        raise CurrencyServiceException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Отсутствуют параметры. Необходим: pairs, например, USD/EUR,EUR/GBP',
+            err_code='INVALID_PARAMETERS'
+        )
+
+    pairs = {}
+    for item in value.split(','):
+        codes = item.strip().split('/')
+        if len(codes) != 2:
+            raise CurrencyServiceException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'Неверная валютная пара {item.strip()!r}. Ожидается формат FROM/TO, например, USD/EUR',
+                err_code='INVALID_PARAMETERS'
+            )
+        from_code, to_code = normalize(codes[0].strip()), normalize(codes[1].strip())
+        if from_code is None or to_code is None:
+            raise CurrencyServiceException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=not_found_message(codes[0].strip() if from_code is None else codes[1].strip()),
+                err_code='CURRENCY_NOT_FOUND'
+            )
+        pairs[(from_code, to_code)] = None
+
+    if len(pairs) > settings.RATES_STREAM_MAX_PAIRS:
+        raise CurrencyServiceException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Слишком много валютных пар. Максимум: {settings.RATES_STREAM_MAX_PAIRS}',
+            err_code='INVALID_PARAMETERS'
+        )
+    return tuple(pairs)
+
+
+def pair_rate(table: RateTable, pair: tuple):
+    """Курс пары по таблице или None, если в таблице нет одной из валют."""
+    try:
+        return table.cross_rate(*pair)
+    except CurrencyServiceException:
+        return None
+
+
+class Subscription:
+    """
+    Подписка на изменения курсов набора пар в цикле событий подписчика.
+
+    Изменения, которые подписчик ещё не забрал, объединяются (для пары остаётся последний курс),
+    поэтому медленный клиент не копит очередь и всегда получает актуальные значения.
+    """
+
+    def __init__(self, broadcaster, pairs: tuple, loop: asyncio.AbstractEventLoop):
+        self.broadcaster = broadcaster
+        self.pairs = pairs
+        self.loop = loop
+        self.table = None
+        self._pending = {}
+        self._fetched_at = None
+        self._ready = asyncio.Event()
+
+    def push(self, changed: dict, fetched_at: float):
+        """Метод для передачи изменений подписчику; вызывается в его цикле событий."""
+        delta = {pair: changed[pair] for pair in self.pairs if pair in changed}
+        if delta:
+            self._pending.update(delta)
+            self._fetched_at = fetched_at
+            self._ready.set()
+
+    async def get(self, timeout: float = None):
+        """
+        Метод для ожидания следующих изменений.
+        :param timeout: Сколько ждать, в секундах.
+        :return: Кортеж (fetched_at, {пара: курс}) или None, если за timeout изменений не было.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._ready.clear()
+        pending, self._pending = self._pending, {}
+        return self._fetched_at, pending
+
+    def close(self):
+        """Метод для отписки."""
+        self.broadcaster.unsubscribe(self)
+
+
+class RateBroadcaster:
+    """
+    Рассылка изменений курсов подписчикам потока (GET /api/rates/stream/) внутри процесса.
+
+    Когда движок устанавливает новую таблицу (обновление по расписанию RateRefresher, таблица другого воркера),
+    курс каждой пары, на которую есть хотя бы одна подписка, вычисляется один раз, и подписчикам в их циклах
+    событий рассылаются только изменившиеся пары. Стоимость снимка не зависит от числа подписчиков,
+    а подписчик без изменений не получает ничего.
+    """
+
+    def __init__(self, engine: RateTableEngine = None):
+        self.engine = engine or get_rate_engine()
+        self._lock = threading.Lock()
+        self._subscribers = collections.defaultdict(set)
+        self._counts = collections.Counter()
+        self._rates = {}
+        self.engine.add_listener(self.publish)
+
+    @property
+    def subscribers(self) -> int:
+        """Число подписок."""
+        return sum(len(subscriptions) for subscriptions in self._subscribers.values())
+
+    def subscribe(self, pairs: tuple, table: RateTable = None) -> Subscription:
+        """
+        Метод для подписки текущего цикла событий на изменения курсов пар.
+        Начальные курсы клиенту нужно отдать по subscription.table: это текущая таблица движка на момент подписки,
+        и любая таблица, установленная позже, придёт изменениями.
+        :param pairs: Пары (from, to), см. parse_pairs.
+        :param table: Таблица на случай, если у движка ещё нет текущей (например, отдана запасная таблица).
+        :return: Объект Subscription.
+        """
+        subscription = Subscription(self, pairs, asyncio.get_running_loop())
+        with self._lock:
+            # Движок сначала устанавливает таблицу, затем вызывает publish, который ждёт эту блокировку,
+            # поэтому таблица, прочитанная здесь, либо уже учтена в _rates, либо будет разослана после подписки
+            table = subscription.table = self.engine.table or table
+            self._subscribers[subscription.loop].add(subscription)
+            for pair in pairs:
+                if not self._counts[pair] and table is not None:
+                    self._rates[pair] = pair_rate(table, pair)
+                self._counts[pair] += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.loop)
+            if subscriptions is None or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.loop]
+            for pair in subscription.pairs:
+                self._counts[pair] -= 1
+                if not self._counts[pair]:
+                    del self._counts[pair]
+                    self._rates.pop(pair, None)
+
+    def publish(self, table: RateTable):
+        """
+        Метод для рассылки изменений по новой таблице (слушатель RateTableEngine).
+        :param table: Новая таблица курсов.
+        """
+        with self._lock:
+            if not self._subscribers:
+                return
+            changed = {}
+            for pair in self._counts:
+                rate = pair_rate(table, pair)
+                if rate != self._rates.get(pair):
+                    self._rates[pair] = changed[pair] = rate
+            if not changed:
+                return
+            targets = [(loop, tuple(subscriptions)) for loop, subscriptions in self._subscribers.items()]
+
+        for loop, subscriptions in targets:
+            try:
+                loop.call_soon_threadsafe(self._fan_out, subscriptions, changed, table.fetched_at)
+            except RuntimeError:
+                # Цикл событий закрыт: его подписки больше не нужны
+                for subscription in subscriptions:
+                    self.unsubscribe(subscription)
+
+    @staticmethod
+    def _fan_out(subscriptions: tuple, changed: dict, fetched_at: float):
+        for subscription in subscriptions:
+            subscription.push(changed, fetched_at)
+
+
+_broadcaster = None
+_broadcaster_lock = threading.Lock()
+
+
+def get_rate_broadcaster() -> RateBroadcaster:
+    """Функция для получения общей для процесса рассылки изменений курсов."""
+    global _broadcaster
+    if _broadcaster is None:
+        with _broadcaster_lock:
+            if _broadcaster is None:
+                _broadcaster = RateBroadcaster()
+    return _broadcaster
+
+
+Gauge('rates_stream_subscribers', 'Подписки на поток изменений курсов в воркере.',
+      lambda: None if _broadcaster is None else _broadcaster.subscribers)
@@ -0,0 +1,146 @@
+import csv
+import io
+import json
+
+from django.conf import settings
+from rest_framework import status
+
+from .exceptions import CurrencyServiceException
+from .money import format_amount
+from .vectorized import get_vector_converter
+
+FORMATS = ('csv', 'ndjson')
+CSV_COLUMNS = ('from', 'to', 'value')
+
+
+class _Line:
+    """Буфер для csv.writer, который возвращает последнюю записанную строку вместо накопления."""
+
+    def write(self, value):
+        return value
+
+
+class BulkConverter:
+    """
+    Потоковая конвертация файлов CSV/NDJSON.
+
+    Строки читаются и выдаются блоками по chunk_size, поэтому расход памяти не зависит от размера файла,
+    а суммы каждого блока конвертируются одним векторным проходом. Курсы берутся из таблицы в памяти,
+    которая фиксируется в начале обработки, так что весь файл конвертируется по одному снимку курсов.
+    """
+
+    def __init__(self, currency_service, chunk_size: int = None):
+        self.currency_service = currency_service
+        self.chunk_size = chunk_size or settings.RATES_BULK_CHUNK_SIZE
+        self._table = None
+
+    @staticmethod
+    def detect_format(filename: str, fmt: str = None) -> str:
+        """
+        Метод для определения формата файла по явному значению или расширению.
+        :param filename: Имя файла.
+        :param fmt: Явно заданный формат (csv или ndjson) или None.
+        :return: Формат csv или ndjson.
+        """
+        fmt = (fmt or filename.rsplit('.', 1)[-1]).lower()
+        if fmt in ('jsonl', 'json'):
+            fmt = 'ndjson'
+        if fmt not in FORMATS:
+            raise CurrencyServiceException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'Неподдерживаемый формат файла. Доступные форматы: {", ".join(FORMATS)}',
+                err_code='INVALID_FORMAT'
+            )
+        return fmt
+
+    def convert(self, lines, fmt: str):
+        """
+        Метод-генератор конвертации строк файла.
+        :param lines: Итерируемый источник текстовых строк (например, открытый файл).
+        :param fmt: Формат csv или ndjson.
+        :return: Генератор строк результата в том же формате.
+        """
+        self._table = self.currency_service.engine.get_table()
+        if fmt == 'csv':
+            return self._convert_csv(lines)
+        return self._convert_ndjson(lines)
+
+    def _convert_csv(self, lines):
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if header is None or [column.strip().lower() for column in header[:3]] != list(CSV_COLUMNS):
+            raise CurrencyServiceException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f'Первая строка CSV должна содержать колонки: {", ".join(CSV_COLUMNS)}',
+                err_code='INVALID_PARAMETERS'
+            )
+
+        def rows():
+            writer = csv.writer(_Line())
+            yield writer.writerow((*CSV_COLUMNS, 'result', 'error'))
+            for chunk in self._chunks((row + [None] * 3)[:3] for row in reader if row):
+                for row, (result, error) in zip(chunk, self._convert_chunk(chunk)):
+                    result = '' if result is None else format_amount(result)
+                    yield writer.writerow((*row, result, error['code'] if error else ''))
+
+        return rows()
+
+    def _convert_ndjson(self, lines):
+        for chunk in self._chunks(self._parse_json(line) for line in lines if line.strip()):
+            for result, error in self._convert_chunk(chunk):
+                yield json.dumps({'result': format_amount(result)} if error is None else {'detail': error},
+                                 ensure_ascii=False) + '\n'
+
+    @staticmethod
+    def _parse_json(line: str) -> tuple:
+        try:
+            item = json.loads(line)
+        except ValueError:
+            item = None
+        if not isinstance(item, dict):
+            return None, None, None
+        return item.get('from'), item.get('to'), item.get('value')
+
+    def _chunks(self, items):
+        chunk = []
+        for item in items:
+            chunk.append(item)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def _convert_chunk(self, chunk: list) -> list:
+        """Конвертация блока строк: список пар (результат, ошибка) в порядке строк."""
+        outcomes = [None] * len(chunk)
+        positions = []
+        valid = []
+
+        for index, (from_currency, to_currency, value) in enumerate(chunk):
+            try:
+                valid.append(self.currency_service.validate_params(
+                    from_currency=from_currency, to_currency=to_currency, value=value
+                ))
+            except CurrencyServiceException as e:
+                outcomes[index] = (None, e.detail)
+                continue
+            positions.append(index)
+
+        if valid:
+            converted = get_vector_converter(self._table).convert_items(valid)
+            for index, (from_currency, to_currency, _), result in zip(positions, valid, converted):
+                if result is None:
+                    try:
+                        self._table.cross_rate(from_currency, to_currency)
+                    except CurrencyServiceException as e:
+                        outcomes[index] = (None, e.detail)
+                        continue
+                outcomes[index] = (result, None)
+
+        return outcomes
+
+
+def open_text(binary_file) -> io.TextIOWrapper:
+    """Функция для построчного чтения бинарного файла как текста UTF-8."""
+    return io.TextIOWrapper(binary_file, encoding='utf-8-sig', newline='')
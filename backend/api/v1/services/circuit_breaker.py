@@ -0,0 +1,117 @@
+import threading
+import time
+
+from django.conf import settings
+from rest_framework import status
+
+from .exceptions import CurrencyServiceException
+from .metrics import Gauge
+
+
+def provider_unavailable_error() -> CurrencyServiceException:
+    """Ошибка, когда запросы к стороннему сервису приостановлены после серии сбоев."""
+    return CurrencyServiceException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Сторонний сервис курсов временно недоступен. Пожалуйста, повторите попытку позже.",
+        err_code='PROVIDER_UNAVAILABLE'
+    )
+
+
+class CircuitBreaker:
+    """
+    Автомат защиты для запросов к стороннему сервису.
+
+    В состоянии closed запросы проходят; после failure_threshold сбоев подряд автомат переходит в open
+    и reset_timeout секунд отклоняет запросы сразу, не дожидаясь таймаута. Затем он пропускает один
+    пробный запрос (half_open): успех закрывает автомат, сбой снова открывает его.
+    failure_threshold = 0 отключает автомат.
+    """
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None):
+        self.failure_threshold = (settings.PROVIDER_BREAKER_FAILURES if failure_threshold is None
+                                  else failure_threshold)
+        self.reset_timeout = settings.PROVIDER_BREAKER_RESET_TIMEOUT if reset_timeout is None else reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Текущее состояние: closed, open или half_open (open, у которого истёк reset_timeout)."""
+        if self._state == self.OPEN and time.monotonic() >= self._opened_at + self.reset_timeout:
+            return self.HALF_OPEN
+        return self._state
+
+    def before_call(self):
+        """
+        Метод, который вызывается перед запросом к стороннему сервису.
+        :raises CurrencyServiceException: 503 PROVIDER_UNAVAILABLE, если автомат открыт
+                                          или пробный запрос уже выполняется.
+        """
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            if self._state == self.OPEN:
+                if time.monotonic() < self._opened_at + self.reset_timeout:
+                    raise provider_unavailable_error()
+                self._state = self.HALF_OPEN
+                self._probing = False
+            if self._state == self.HALF_OPEN:
+                # Пробный запрос, по которому за reset_timeout не пришло результата, считается потерянным
+                if self._probing and time.monotonic() < self._probe_started + self.reset_timeout:
+                    raise provider_unavailable_error()
+                self._probing = True
+                self._probe_started = time.monotonic()
+
+    def record_success(self):
+        """Метод для учёта успешного ответа: автомат закрывается, счётчик сбоев обнуляется."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """Метод для учёта сбоя: после failure_threshold сбоев подряд или сбоя пробного запроса автомат открывается."""
+        if not self.failure_threshold:
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def cancel(self):
+        """Метод для отмены запроса, разрешённого before_call, который так и не был отправлен."""
+        with self._lock:
+            self._probing = False
+
+
+_breaker = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Функция для получения общего для процесса автомата защиты стороннего сервиса."""
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker()
+    return _breaker
+
+
+def _breaker_state():
+    if _breaker is None:
+        return None
+    return (CircuitBreaker.CLOSED, CircuitBreaker.HALF_OPEN, CircuitBreaker.OPEN).index(_breaker.state)
+
+
+Gauge('provider_circuit_state', 'Состояние автомата защиты стороннего сервиса: 0 — closed, 1 — half_open, 2 — open.',
+      _breaker_state)
@@ -0,0 +1,60 @@
+import hashlib
+import json
+import sys
+
+# Доступные коды валют
+DB_VALUES = {
+    "USD", "AED", "AFN", "ALL", "AMD", "ANG", "AOA", "ARS", "AUD", "AWG", "AZN", "BAM", "BBD", "BDT", "BGN", "BHD",
+    "BIF", "BMD", "BND", "BOB", "BRL", "BSD", "BTN", "BWP", "BYN", "BZD", "CAD", "CDF", "CHF", "CLP", "CNY", "COP",
+    "CRC", "CUP", "CVE", "CZK", "DJF", "DKK", "DOP", "DZD", "EGP", "ERN", "ETB", "EUR", "FJD", "FKP", "FOK", "GBP",
+    "GEL", "GGP", "GHS", "GIP", "GMD", "GNF", "GTQ", "GYD", "HKD", "HNL", "HRK", "HTG", "HUF", "IDR", "ILS", "IMP",
+    "INR", "IQD", "IRR", "ISK", "JEP", "JMD", "JOD", "JPY", "KES", "KGS", "KHR", "KID", "KMF", "KRW", "KWD", "KYD",
+    "KZT", "LAK", "LBP", "LKR", "LRD", "LSL", "LYD", "MAD", "MDL", "MGA", "MKD", "MMK", "MNT", "MOP", "MRU", "MUR",
+    "MVR", "MWK", "MXN", "MYR", "MZN", "NAD", "NGN", "NIO", "NOK", "NPR", "NZD", "OMR", "PAB", "PEN", "PGK", "PHP",
+    "PKR", "PLN", "PYG", "QAR", "RON", "RSD", "RUB", "RWF", "SAR", "SBD", "SCR", "SDG", "SEK", "SGD", "SHP", "SLE",
+    "SLL", "SOS", "SRD", "SSP", "STN", "SYP", "SZL", "THB", "TJS", "TMT", "TND", "TOP", "TRY", "TTD", "TVD", "TWD",
+    "TZS", "UAH", "UGX", "UYU", "UZS", "VES", "VND", "VUV", "WST", "XAF", "XCD", "XDR", "XOF", "XPF", "YER", "ZAR",
+    "ZMW", "ZWL"
+}
+
+# Коды в фиксированном порядке и их индексы: по ним строятся плотные векторы курсов
+CODES = tuple(sys.intern(code) for code in sorted(DB_VALUES))
+INDEX = {code: index for index, code in enumerate(CODES)}
+
+# Нормализация без выделения памяти: типичные написания кода сразу отображаются на интернированный код
+_LOOKUP = {}
+for _code in CODES:
+    for _variant in (_code, _code.lower(), _code.capitalize()):
+        _LOOKUP[_variant] = _code
+
+# Отсортированный список доступных валют для сообщений об ошибках и GET /api/currencies/
+AVAILABLE_CURRENCIES_TEXT = repr(list(CODES))
+CURRENCIES_PAYLOAD = json.dumps({'currencies': CODES}, separators=(',', ':')).encode()
+CURRENCIES_ETAG = f'"{hashlib.sha1(CURRENCIES_PAYLOAD).hexdigest()[:16]}"'
+
+
+def normalize(code):
+    """
+    Функция для приведения кода валюты к каноническому виду.
+    :param code: Код валюты в любом регистре.
+    :return: Интернированный код в верхнем регистре или None, если такой валюты нет.
+    """
+    result = _LOOKUP.get(code)
+    if result is None and isinstance(code, str) and len(code) == 3:
+        result = _LOOKUP.get(code.upper())
+    return result
+
+
+def index_of(code):
+    """
+    Функция для получения индекса валюты в CODES.
+    :param code: Код валюты в любом регистре.
+    :return: Индекс или None, если такой валюты нет.
+    """
+    code = normalize(code)
+    return None if code is None else INDEX[code]
+
+
+def not_found_message(code) -> str:
+    """Сообщение об ошибке для неизвестной валюты; список валют сформирован заранее."""
+    return f'Не найдена валюта {code}. Список доступных валют: {AVAILABLE_CURRENCIES_TEXT}'
@@ -0,0 +1,248 @@
+import datetime
+from decimal import Decimal
+
+from rest_framework import status
+
+from .currencies import CODES, DB_VALUES, normalize, not_found_message
+from .exceptions import CurrencyServiceException
+from .money import convert_amount, parse_amount
+from .provider import ExchangeRateClient
+from .rate_table import RateTable, RateTableEngine, get_rate_engine
+from .shared_store import LocalRateStore
+from .snapshots import load_snapshot_on
+from .vectorized import get_vector_converter
+
+
+class CurrencyService:
+    """
+    Сервис для работы с валютами, включая проверку валют и получение курсов обмена.
+
+    Атрибуты:
+    - DB_VALUES: Множество, содержащее доступные коды/названия валют.
+
+    По умолчанию используется общий для процесса движок таблицы курсов. Чтобы направить сервис
+    на другой источник (например, локальную заглушку в тестах), передайте client или engine;
+    таблица такого клиента хранится только в памяти сервиса и не смешивается с общей.
+    """
+    DB_VALUES = DB_VALUES
+
+    def __init__(self, client: ExchangeRateClient = None, engine: RateTableEngine = None):
+        if engine is None and client is not None:
+            engine = RateTableEngine(fetcher=client.latest, store=LocalRateStore())
+        self.engine = engine or get_rate_engine()
+
+    def check_currency(self, name_currency: str) -> bool:
+        """
+        Метод для проверки наличия названия валюты в множестве(set) для запроса.
+        :param name_currency: Название валюты (строка) для проверки.
+        :return: Bool значение True, если валюта найдена в DB_VALUES, иначе False.
+        """
+        result = normalize(name_currency) is not None
+        return result
+
+    def validate_params(self, from_currency, to_currency, value) -> tuple:
+        """
+        Метод для проверки параметров конвертации.
+        :param from_currency: Название валюты, из которой конвертируем.
+        :param to_currency: Название валюты, в которую конвертируем.
+        :param value: Сумма для конвертации (число или строка с числом).
+        :return: Кортеж (from_currency, to_currency, value) с кодами в верхнем регистре и суммой типа Decimal.
+        :raises CurrencyServiceException: 400 с кодом ошибки, если параметры неверны.
+        """
+        if any(param is None or param == '' for param in (from_currency, to_currency, value)):
+            raise CurrencyServiceException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Отсутствуют параметры. Необходимы: from, to, value',
+                err_code='INVALID_PARAMETERS'
+            )
+
+        if not isinstance(from_currency, str) or not isinstance(to_currency, str):
+            raise CurrencyServiceException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Неверные коды валюты. Должны быть строками.',
+                err_code='INVALID_CURRENCY_CODE'
+            )
+
+        from_code = normalize(from_currency)
+        to_code = normalize(to_currency)
+        if from_code is None or to_code is None:
+            raise CurrencyServiceException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=not_found_message(from_currency if from_code is None else to_currency),
+                err_code='CURRENCY_NOT_FOUND'
+            )
+
+        value = parse_amount(value)
+
+        return from_code, to_code, value
+
+    def get_rate(self, from_currency: str, to_currency: str) -> float:
+        """
+        Метод для получения курса обмена валютной пары.
+        Курс вычисляется как кросс-курс по таблице, которая хранится в памяти
+        и обновляется одним запросом к стороннему сервису на всю таблицу.
+        :param from_currency: Название валюты, из которой конвертируем (строка).
+        :param to_currency: Название валюты, в которую конвертируем (строка).
+        :return: Курс обмена (float) между from_currency и to_currency.
+        """
+        return self.get_exchange_rate(from_currency=from_currency.upper(), to_currency=to_currency.upper())
+
+    def convert(self, from_currency: str, to_currency: str, value: Decimal, date: datetime.date = None,
+                table: RateTable = None) -> Decimal:
+        """
+        Метод для конвертации суммы из одной валюты в другую.
+        :param from_currency: Название валюты, из которой конвертируем (строка).
+        :param to_currency: Название валюты, в которую конвертируем (строка).
+        :param value: Сумма для конвертации (Decimal).
+        :param date: Дата, по курсам которой конвертируем (из сохранённых снимков); None — текущие курсы.
+        :param table: Уже полученная таблица курсов (см. get_table); если передана, date не используется.
+        :return: Конвертированная сумма (Decimal), округлённая до минорных единиц to_currency (settings.MONEY_ROUNDING).
+        """
+        table = table or self.get_table(date=date)
+        return convert_amount(table, from_currency.upper(), to_currency.upper(), parse_amount(value))
+
+    def get_table(self, date: datetime.date = None) -> RateTable:
+        """
+        Метод для получения таблицы курсов, по которой выполняется конвертация.
+        :param date: Дата из сохранённых снимков; None — текущая таблица.
+        :return: Объект RateTable.
+        """
+        if date is None:
+            return self.engine.get_table()
+        return self.get_historical_table(date)
+
+    def get_historical_table(self, date: datetime.date) -> RateTable:
+        """
+        Метод для получения таблицы курсов на дату из сохранённых снимков, без обращения к стороннему сервису.
+        :param date: Дата.
+        :return: Объект RateTable.
+        """
+        rates, fetched_at = load_snapshot_on(base=self.engine.base, date=date)
+        return RateTable(base=self.engine.base, rates=rates, fetched_at=fetched_at)
+
+    @staticmethod
+    def parse_date(value):
+        """
+        Метод для разбора параметра даты.
+        :param value: Строка в формате ГГГГ-ММ-ДД или None.
+        :return: Объект date или None, если параметр не передан.
+        """
+        if not value:
+            return None
+        try:
+            return datetime.date.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise CurrencyServiceException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Неверная дата. Ожидается формат ГГГГ-ММ-ДД.',
+                err_code='INVALID_DATE'
+            )
+
+    def convert_batch(self, items: list) -> list:
+        """
+        Метод для пакетной конвертации.
+        Все проверенные элементы конвертируются одним векторным проходом по таблице курсов.
+        :param items: Список словарей с ключами from, to, value.
+        :return: Список той же длины: {'result': сумма (Decimal)} или {'detail': {'code': ..., 'message': ...}}.
+        """
+        results = [None] * len(items)
+        positions = []
+        valid = []
+
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise CurrencyServiceException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail='Отсутствуют параметры. Необходимы: from, to, value',
+                        err_code='INVALID_PARAMETERS'
+                    )
+                valid.append(self.validate_params(
+                    from_currency=item.get('from'), to_currency=item.get('to'), value=item.get('value')
+                ))
+            except CurrencyServiceException as e:
+                results[index] = {'detail': e.detail}
+                continue
+            positions.append(index)
+
+        if not valid:
+            return results
+
+        try:
+            table = self.engine.get_table()
+        except CurrencyServiceException as e:
+            for index in positions:
+                results[index] = {'detail': e.detail}
+            return results
+
+        converted = get_vector_converter(table).convert_items(valid)
+        for index, (from_currency, to_currency, _), result in zip(positions, valid, converted):
+            if result is None:
+                try:
+                    table.cross_rate(from_currency, to_currency)
+                except CurrencyServiceException as e:
+                    results[index] = {'detail': e.detail}
+                    continue
+            results[index] = {'result': result}
+
+        return results
+
+    def validate_matrix_params(self, from_currency, to_currencies, value) -> tuple:
+        """
+        Метод для проверки параметров конвертации одной суммы во многие валюты.
+        :param from_currency: Название валюты, из которой конвертируем.
+        :param to_currencies: Коды валют назначения через запятую или * (все валюты таблицы курсов).
+        :param value: Сумма для конвертации (число или строка с числом).
+        :return: Кортеж (from_currency, to_currencies, value): код в верхнем регистре, кортеж кодов без повторов
+                 в порядке запроса или None для *, сумма типа Decimal.
+        :raises CurrencyServiceException: 400 с кодом ошибки, если параметры неверны.
+        """
+        if not isinstance(to_currencies, str) or not to_currencies.strip(' ,'):
+            raise CurrencyServiceException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Отсутствуют параметры. Необходимы: from, to, value',
+                err_code='INVALID_PARAMETERS'
+            )
+        from_code, _, value = self.validate_params(from_currency=from_currency, to_currency=from_currency, value=value)
+        if to_currencies.strip() == '*':
+            return from_code, None, value
+
+        targets = {}
+        for code in filter(None, (code.strip() for code in to_currencies.split(','))):
+            to_code = normalize(code)
+            if to_code is None:
+                raise CurrencyServiceException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=not_found_message(code),
+                    err_code='CURRENCY_NOT_FOUND'
+                )
+            targets[to_code] = None
+        return from_code, tuple(targets), value
+
+    def convert_matrix(self, from_currency: str, to_currencies, value: Decimal, table: RateTable = None) -> dict:
+        """
+        Метод для конвертации одной суммы во многие валюты одним векторным проходом по таблице курсов.
+        :param from_currency: Код валюты, из которой конвертируем (строка в верхнем регистре).
+        :param to_currencies: Кортеж кодов валют назначения или None — все валюты, курсы которых есть в таблице.
+        :param value: Сумма для конвертации (Decimal).
+        :param table: Уже полученная таблица курсов (см. get_table).
+        :return: Словарь {код валюты: сумма (Decimal) или None, если курса нет в таблице} в порядке to_currencies.
+        """
+        table = table or self.get_table()
+        # Без курса исходной валюты не вычислить ни одну сумму: ошибка вместо матрицы из None
+        table.cross_rate(from_currency, from_currency)
+        if to_currencies is None:
+            to_currencies = [code for code in CODES if code in table.rates]
+        converted = get_vector_converter(table).convert_items(
+            [(from_currency, to_currency, value) for to_currency in to_currencies]
+        )
+        return dict(zip(to_currencies, converted))
+
+    def get_exchange_rate(self, from_currency: str, to_currency: str) -> float:
+        """
+        Метод для получения курса валют по таблице курсов.
+        :param from_currency: Код валюты, из которой конвертируем (строка в верхнем регистре).
+        :param to_currency: Код валюты, в которую конвертируем (строка в верхнем регистре).
+        :return: Курс обмена (float) между from_currency и to_currency.
+        """
+        return self.engine.get_table().cross_rate(from_currency, to_currency)
@@ -0,0 +1,11 @@
+from rest_framework.exceptions import APIException
+
+from .metrics import ERRORS
+
+
+class CurrencyServiceException(APIException):
+    def __init__(self, status_code, detail, err_code='CURRENCY_SERVICE_ERROR'):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = {'code': err_code, 'message': detail}
+        ERRORS.inc(err_code)
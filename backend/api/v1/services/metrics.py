@@ -0,0 +1,287 @@
+import bisect
+import glob
+import json
+import math
+import os
+import threading
+import time
+
+from django.conf import settings
+
+# Границы корзин гистограмм по умолчанию (секунды), как в клиентах Prometheus
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+# Корзины для коротких участков обработки запроса (проверка параметров, конвертация)
+FAST_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Metric:
+    """
+    Базовый класс метрики: значения хранятся в словаре {кортеж значений меток: значение}.
+    Обновление — одна операция со словарём под общей блокировкой реестра, поэтому метрики
+    можно оставлять включёнными на горячем пути.
+    """
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.registry = registry or REGISTRY
+        self._lock = self.registry.lock
+        self._values = {}
+        self.registry.register(self)
+
+    def state(self) -> dict:
+        """Копия значений метрики (для выгрузки и объединения между процессами)."""
+        with self._lock:
+            return {labels: self._copy(value) for labels, value in self._values.items()}
+
+    @staticmethod
+    def _copy(value):
+        return value
+
+    @staticmethod
+    def merge(left, right):
+        return left + right
+
+    def samples(self, values: dict):
+        """Строки выборок в текстовом формате Prometheus: кортежи (суффикс имени, метки, значение)."""
+        for labels, value in sorted(values.items()):
+            yield '', dict(zip(self.labelnames, labels)), value
+
+
+class Counter(Metric):
+    """Монотонно растущий счётчик."""
+    type = 'counter'
+
+    def inc(self, *labels, amount: float = 1.0):
+        """
+        Метод для увеличения счётчика.
+        :param labels: Значения меток в порядке labelnames.
+        :param amount: На сколько увеличить.
+        """
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Histogram(Metric):
+    """Гистограмма наблюдений с фиксированными корзинами (значение — счётчики корзин и сумма)."""
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS,
+                 registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels):
+        """
+        Метод для добавления наблюдения.
+        :param value: Наблюдаемое значение (например, длительность в секундах).
+        :param labels: Значения меток в порядке labelnames.
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labels)
+            if state is None:
+                # Счётчики корзин, последняя — +Inf, затем сумма наблюдений
+                state = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            state[index] += 1
+            state[-1] += value
+
+    @staticmethod
+    def _copy(value):
+        return list(value)
+
+    @staticmethod
+    def merge(left, right):
+        return [a + b for a, b in zip(left, right)]
+
+    def samples(self, values: dict):
+        for labels, state in sorted(values.items()):
+            labels = dict(zip(self.labelnames, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state):
+                cumulative += count
+                yield '_bucket', {**labels, 'le': _format_value(bound)}, cumulative
+            yield '_sum', labels, state[-1]
+            yield '_count', labels, cumulative
+
+
+class Gauge(Metric):
+    """Мгновенное значение, которое вычисляется функцией в момент выгрузки метрик."""
+    type = 'gauge'
+
+    def __init__(self, name: str, documentation: str, function, registry=None):
+        super().__init__(name, documentation, registry=registry)
+        self.function = function
+
+    def state(self) -> dict:
+        value = self.function()
+        return {} if value is None else {(): float(value)}
+
+
+class Registry:
+    """
+    Реестр метрик процесса.
+
+    Если задан settings.METRICS_DIR, каждый процесс не чаще раза в METRICS_FLUSH_INTERVAL секунд
+    сохраняет свои счётчики и гистограммы в файл этой папки, а выгрузка суммирует файлы всех воркеров.
+    Файл завершившегося воркера переносится в общий архив (см. mark_process_dead).
+    Иначе выгружаются метрики только того воркера, который обработал запрос /metrics.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = []
+        self._flushed_at = 0.0
+
+    def register(self, metric: Metric):
+        self.metrics.append(metric)
+
+    def maybe_flush(self):
+        """Метод для сохранения метрик процесса в METRICS_DIR, если с прошлого сохранения прошло достаточно времени."""
+        if settings.METRICS_DIR and time.monotonic() - self._flushed_at >= settings.METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Метод для сохранения счётчиков и гистограмм процесса в METRICS_DIR."""
+        self._flushed_at = time.monotonic()
+        data = {
+            metric.name: [[list(labels), value] for labels, value in metric.state().items()]
+            for metric in self.metrics if not isinstance(metric, Gauge)
+        }
+        os.makedirs(settings.METRICS_DIR, exist_ok=True)
+        path = os.path.join(settings.METRICS_DIR, f'metrics_{os.getpid()}.json')
+        temp_path = f'{path}.{threading.get_ident()}.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(data, file)
+        os.replace(temp_path, path)
+
+    def mark_process_dead(self, pid: int):
+        """
+        Метод для учёта завершившегося воркера (вызывается мастером gunicorn в child_exit).
+        Его счётчики и гистограммы добавляются в архив metrics_archive.json, а файл воркера удаляется:
+        суммы в /metrics не уменьшаются (Prometheus принял бы это за сброс счётчика), а файлы не копятся.
+        :param pid: PID завершившегося воркера.
+        """
+        if not settings.METRICS_DIR:
+            return
+
+        path = os.path.join(settings.METRICS_DIR, f'metrics_{pid}.json')
+        for temp_path in glob.glob(f'{glob.escape(path)}.*.tmp'):
+            os.remove(temp_path)
+        try:
+            with open(path) as file:
+                dead = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            dead = {}
+
+        archive_path = os.path.join(settings.METRICS_DIR, 'metrics_archive.json')
+        try:
+            with open(archive_path) as file:
+                archive = json.load(file)
+        except (OSError, ValueError):
+            archive = {}
+
+        for name, entries in dead.items():
+            merged = {tuple(labels): value for labels, value in archive.get(name, [])}
+            for labels, value in entries:
+                labels = tuple(labels)
+                # Значение счётчика — число, гистограммы — список (как в Counter.merge и Histogram.merge)
+                if labels not in merged:
+                    merged[labels] = value
+                elif isinstance(value, list):
+                    merged[labels] = [a + b for a, b in zip(merged[labels], value)]
+                else:
+                    merged[labels] += value
+            archive[name] = [[list(labels), value] for labels, value in merged.items()]
+
+        temp_path = f'{archive_path}.{pid}.tmp'
+        with open(temp_path, 'w') as file:
+            json.dump(archive, file)
+        os.replace(temp_path, archive_path)
+        os.remove(path)
+
+    def collect(self) -> dict:
+        """
+        Метод для получения значений всех метрик.
+        :return: Словарь {метрика: {кортеж значений меток: значение}}.
+        """
+        if not settings.METRICS_DIR:
+            return {metric: metric.state() for metric in self.metrics}
+
+        self.flush()
+        by_name = {metric.name: metric for metric in self.metrics}
+        values = {metric: {} if not isinstance(metric, Gauge) else metric.state() for metric in self.metrics}
+        for path in glob.glob(os.path.join(settings.METRICS_DIR, 'metrics_*.json')):
+            try:
+                with open(path) as file:
+                    data = json.load(file)
+            except (OSError, ValueError):
+                continue
+            for name, entries in data.items():
+                metric = by_name.get(name)
+                if metric is None:
+                    continue
+                merged = values[metric]
+                for labels, value in entries:
+                    labels = tuple(labels)
+                    merged[labels] = metric.merge(merged[labels], value) if labels in merged else value
+        return values
+
+    def render(self) -> str:
+        """
+        Метод для выгрузки метрик в текстовом формате Prometheus.
+        :return: Текст ответа /metrics.
+        """
+        lines = []
+        for metric, values in self.collect().items():
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.type}')
+            for suffix, labels, value in metric.samples(values):
+                lines.append(f'{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"'))
+        for name, value in labels.items()
+    )
+    return f'{{{pairs}}}'
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value))
+
+
+REGISTRY = Registry()
+
+REQUESTS = Counter('http_requests_total', 'Обработанные HTTP-запросы.', ('endpoint', 'method', 'status'))
+REQUEST_DURATION = Histogram('http_request_duration_seconds', 'Время обработки HTTP-запроса.', ('endpoint',))
+STAGE_DURATION = Histogram(
+    'conversion_stage_duration_seconds',
+    'Время этапов конвертации: validate — проверка параметров, table — получение таблицы курсов, '
+    'convert — вычисление суммы.',
+    ('stage',), buckets=FAST_BUCKETS
+)
+ERRORS = Counter('currency_service_errors_total', 'Ошибки CurrencyServiceException по коду.', ('code',))
+CACHE_REQUESTS = Counter(
+    'rates_cache_requests_total',
+    'Обращения к уровням кеша курсов: memory — таблица в памяти воркера, shared — общее хранилище узла, '
+    'snapshot — снимок в БД при старте, http — условные запросы (hit — ответ 304). '
+    'Результат: hit, stale (устаревшая таблица отдана с фоновым обновлением) или miss.',
+    ('layer', 'result')
+)
+UPSTREAM_DURATION = Histogram(
+    'upstream_request_duration_seconds', 'Время запроса к стороннему сервису курсов (вместе с повторами).',
+    ('endpoint', 'status')
+)
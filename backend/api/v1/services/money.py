@@ -0,0 +1,138 @@
+import decimal
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework import status
+
+from .currencies import DB_VALUES
+from .exceptions import CurrencyServiceException
+from .rate_table import RateTable
+
+# Число знаков дробной части (минорных единиц) валют по ISO 4217; для остальных валют — 2
+ZERO_DECIMAL_CURRENCIES = frozenset({
+    'BIF', 'CLP', 'DJF', 'GNF', 'ISK', 'JPY', 'KMF', 'KRW', 'PYG', 'RWF', 'UGX', 'VND', 'VUV', 'XAF', 'XOF', 'XPF',
+})
+THREE_DECIMAL_CURRENCIES = frozenset({'BHD', 'IQD', 'JOD', 'KWD', 'LYD', 'OMR', 'TND'})
+
+MINOR_UNITS = {
+    code: 0 if code in ZERO_DECIMAL_CURRENCIES else 3 if code in THREE_DECIMAL_CURRENCIES else 2
+    for code in DB_VALUES
+}
+
+ROUNDING_MODES = frozenset({
+    decimal.ROUND_HALF_EVEN, decimal.ROUND_HALF_UP, decimal.ROUND_HALF_DOWN,
+    decimal.ROUND_UP, decimal.ROUND_DOWN, decimal.ROUND_CEILING, decimal.ROUND_FLOOR,
+})
+
+# Суммы с большим порядком или числом знаков отклоняются, чтобы точная арифметика не работала с гигантскими числами
+MAX_AMOUNT_EXPONENT = 18
+MAX_AMOUNT_DECIMALS = 18
+
+
+def get_rounding() -> str:
+    """Функция для получения режима округления из настроек (settings.MONEY_ROUNDING)."""
+    rounding = settings.MONEY_ROUNDING
+    if rounding not in ROUNDING_MODES:
+        raise ValueError(f"Unsupported MONEY_ROUNDING: {rounding}")
+    return rounding
+
+
+def parse_amount(value) -> Decimal:
+    """
+    Функция для разбора суммы в Decimal без потери точности.
+    :param value: Число или строка с числом; float берётся по его кратчайшей десятичной записи.
+    :return: Конечное значение Decimal.
+    :raises CurrencyServiceException: 400 INVALID_VALUE, если значение не является допустимым числом.
+    """
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        if isinstance(value, float):
+            value = repr(value)
+        amount = Decimal(value.strip() if isinstance(value, str) else value)
+        if (not amount.is_finite() or amount.adjusted() > MAX_AMOUNT_EXPONENT
+                or amount.as_tuple().exponent < -MAX_AMOUNT_DECIMALS):
+            raise ValueError
+    except (TypeError, ValueError, ArithmeticError):
+        raise CurrencyServiceException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Неверное значение параметра. Должно быть числом.',
+            err_code='INVALID_VALUE'
+        )
+    return amount
+
+
+def round_div(numerator: int, denominator: int, rounding: str) -> int:
+    """
+    Функция для точного целочисленного деления с округлением.
+    :param numerator: Делимое.
+    :param denominator: Делитель (> 0).
+    :param rounding: Режим округления (константа модуля decimal).
+    :return: numerator / denominator, округлённое до целого.
+    """
+    quotient, remainder = divmod(numerator, denominator)
+    if not remainder:
+        return quotient
+
+    # quotient — округление вниз; дальше решаем, нужно ли перейти к quotient + 1
+    if rounding == decimal.ROUND_FLOOR:
+        return quotient
+    if rounding == decimal.ROUND_CEILING:
+        return quotient + 1
+    if rounding == decimal.ROUND_DOWN:
+        return quotient + (quotient < 0)
+    if rounding == decimal.ROUND_UP:
+        return quotient + (quotient >= 0)
+
+    twice = 2 * remainder
+    if twice != denominator:
+        return quotient + (twice > denominator)
+    if rounding == decimal.ROUND_HALF_EVEN:
+        return quotient + (quotient & 1)
+    if rounding == decimal.ROUND_HALF_UP:
+        return quotient + (quotient >= 0)
+    return quotient + (quotient < 0)
+
+
+def convert_units(table: RateTable, from_currency: str, to_currency: str, amount: Decimal, rounding: str) -> int:
+    """
+    Функция для точной конвертации суммы в минорные единицы валюты назначения.
+    :param table: Таблица курсов.
+    :param from_currency: Код валюты, из которой конвертируем (строка в верхнем регистре).
+    :param to_currency: Код валюты, в которую конвертируем (строка в верхнем регистре).
+    :param amount: Сумма для конвертации (Decimal).
+    :param rounding: Режим округления.
+    :return: Конвертированная сумма в минорных единицах to_currency (целое).
+    """
+    rate = table.exact_cross_rate(from_currency, to_currency)
+    numerator, denominator = amount.as_integer_ratio()
+    return round_div(
+        numerator * rate.numerator * 10 ** MINOR_UNITS[to_currency], denominator * rate.denominator, rounding
+    )
+
+
+def convert_amount(table: RateTable, from_currency: str, to_currency: str, amount: Decimal,
+                   rounding: str = None) -> Decimal:
+    """
+    Функция для точной конвертации суммы с округлением до минорных единиц валюты назначения.
+    :param table: Таблица курсов.
+    :param from_currency: Код валюты, из которой конвертируем (строка в верхнем регистре).
+    :param to_currency: Код валюты, в которую конвертируем (строка в верхнем регистре).
+    :param amount: Сумма для конвертации (Decimal).
+    :param rounding: Режим округления; по умолчанию settings.MONEY_ROUNDING.
+    :return: Конвертированная сумма (Decimal) с числом знаков, равным MINOR_UNITS[to_currency].
+    """
+    minor = convert_units(table, from_currency, to_currency, amount, rounding or get_rounding())
+    # Конструктор Decimal, в отличие от scaleb, не округляет значение до точности контекста
+    return Decimal(f'{minor}E-{MINOR_UNITS[to_currency]}')
+
+
+def format_amount(amount):
+    """
+    Функция для представления суммы в ответе API.
+    Сумма отдаётся строкой: числа JSON большинство клиентов читает как float, который теряет знаки у больших сумм
+    и дописывает .0 к суммам валют без минорных единиц.
+    :param amount: Сумма (Decimal) или None.
+    :return: Строка без экспоненты с числом знаков валюты, например "15612" или "92.35"; None для None.
+    """
+    return None if amount is None else f'{amount:f}'
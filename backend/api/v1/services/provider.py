@@ -0,0 +1,218 @@
+import logging
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from requests.exceptions import HTTPError
+from rest_framework import status
+from urllib3.exceptions import MaxRetryError, ResponseError
+from urllib3.util.retry import Retry
+
+from .circuit_breaker import CircuitBreaker, get_circuit_breaker
+from .exceptions import CurrencyServiceException
+from .metrics import UPSTREAM_DURATION
+from .rate_budget import RequestBudget, get_request_budget
+
+logger = logging.getLogger(__name__)
+
+
+def check_result(data: dict) -> dict:
+    """
+    Функция для проверки ответа стороннего сервиса.
+    :param data: Разобранный JSON ответа.
+    :return: Тот же словарь, если запрос выполнен успешно.
+    """
+    if data['result'] == 'success':
+        return data
+    else:
+        raise CurrencyServiceException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка внешнего API: {data.get('error-type')}"
+        )
+
+
+def parse_latest(data: dict, base_currency: str) -> dict:
+    """
+    Функция для извлечения таблицы курсов из ответа /latest/{base}.
+    :param data: Разобранный JSON ответа.
+    :param base_currency: Код базовой валюты (строка).
+    :return: Словарь {код валюты: курс} относительно base_currency.
+    """
+    rates = data.get('conversion_rates')
+    if not rates:
+        raise CurrencyServiceException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Не удалось получить таблицу курсов для {base_currency}"
+        )
+    return rates
+
+
+def retry_statuses(budget: RequestBudget) -> tuple:
+    """
+    Функция для получения статусов ответа, на которые запрос повторяется.
+    При заданном бюджете запросов ответ 429 не повторяется: сторонний сервис уже сообщил, что квота исчерпана.
+    :param budget: Бюджет запросов клиента.
+    :return: Кортеж статусов.
+    """
+    if budget.enabled:
+        return tuple(code for code in ExchangeRateClient.RETRY_STATUSES if code != 429)
+    return ExchangeRateClient.RETRY_STATUSES
+
+
+class BudgetedRetry(Retry):
+    """
+    Политика повторов urllib3, которая списывает каждый повтор из бюджета запросов (RequestBudget).
+    Если бюджет исчерпан, повторы прекращаются так же, как при исчерпании числа попыток.
+    """
+
+    def __init__(self, *args, budget: RequestBudget = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.budget = budget
+
+    def new(self, **kw):
+        retry = super().new(**kw)
+        retry.budget = self.budget
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None, _stacktrace=None):
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)
+        if self.budget is not None:
+            try:
+                self.budget.acquire()
+            except CurrencyServiceException:
+                raise MaxRetryError(_pool, url, error or ResponseError('request budget exhausted'))
+        return retry
+
+
+class ExchangeRateClient:
+    """
+    Клиент стороннего сервиса курсов валют с долгоживущей сессией.
+
+    Соединения с BASE_URL переиспользуются из пула (keep-alive), поэтому TCP/TLS рукопожатие
+    выполняется один раз на соединение, а не на каждый запрос. Таймауты на подключение и чтение
+    задаются раздельно, временные ошибки повторяются ограниченное число раз с паузой.
+    После серии сбоев автомат защиты (breaker) отклоняет запросы сразу, а бюджет (budget) не даёт превысить
+    квоту стороннего сервиса; по умолчанию оба общие для процесса (и бюджет — для узла).
+    """
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    def __init__(self, base_url: str = None, api_key: str = None, pool_size: int = None,
+                 connect_timeout: float = None, read_timeout: float = None, retries: int = None,
+                 backoff_factor: float = None, session: requests.Session = None, breaker: CircuitBreaker = None,
+                 budget: RequestBudget = None):
+        self.base_url = (base_url or settings.BASE_URL).rstrip('/')
+        self.api_key = settings.API_KEY if api_key is None else api_key
+        self.timeout = (
+            settings.PROVIDER_CONNECT_TIMEOUT if connect_timeout is None else connect_timeout,
+            settings.PROVIDER_READ_TIMEOUT if read_timeout is None else read_timeout,
+        )
+        self.breaker = breaker or get_circuit_breaker()
+        self.budget = budget or get_request_budget()
+        self.session = session or self._build_session(
+            pool_size=settings.PROVIDER_POOL_SIZE if pool_size is None else pool_size,
+            retries=settings.PROVIDER_RETRIES if retries is None else retries,
+            backoff_factor=settings.PROVIDER_BACKOFF_FACTOR if backoff_factor is None else backoff_factor,
+        )
+
+    def _build_session(self, pool_size: int, retries: int, backoff_factor: float) -> requests.Session:
+        # Бюджет списывается за каждый отправленный запрос: первый — в _get, повторы — в BudgetedRetry
+        retry = BudgetedRetry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=retry_statuses(self.budget),
+            allowed_methods=frozenset({'GET'}),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+            budget=self.budget,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def latest(self, base_currency: str) -> dict:
+        """
+        Метод для запроса полной таблицы курсов относительно базовой валюты.
+        :param base_currency: Код базовой валюты (строка).
+        :return: Словарь {код валюты: курс} относительно base_currency.
+        """
+        return parse_latest(self._get(f"latest/{base_currency}"), base_currency)
+
+    def close(self):
+        """Метод для закрытия соединений пула."""
+        self.session.close()
+
+    def _get(self, path: str) -> dict:
+        # Запрос проходит через автомат защиты и бюджет запросов; сбоем считается всё, кроме ответа 4xx (кроме 429)
+        self.breaker.before_call()
+        try:
+            self.budget.acquire()
+        except CurrencyServiceException:
+            self.breaker.cancel()
+            raise
+
+        try:
+            data = self._request(path)
+        except CurrencyServiceException as e:
+            if 400 <= e.status_code < 500 and e.status_code != 429:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+            raise
+        self.breaker.record_success()
+        return data
+
+    def _request(self, path: str) -> dict:
+        started = time.perf_counter()
+        outcome = 'error'
+        try:
+            url = f"{self.base_url}/{self.api_key}/{path}"
+
+            response = self.session.get(url, timeout=self.timeout)
+            outcome = str(response.status_code)
+            response.raise_for_status()  # Проверка на ошибки HTTP
+            return check_result(response.json())
+        except CurrencyServiceException:
+            raise
+
+        except HTTPError as e:
+            logger.error(f"HTTP error from external API: {e}")
+            raise CurrencyServiceException(
+                status_code=e.response.status_code,
+                detail=f"Ошибка при извлечении данных из внешнего API: {e}"
+            )
+
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Currency service unavailable: {e}")
+            raise CurrencyServiceException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Услуга обмена валюты недоступна. Пожалуйста, повторите попытку позже."
+            )
+
+        except Exception as e:
+            logger.error(f"An unexpected error occurred: {e}")
+            raise CurrencyServiceException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Произошла непредвиденная ошибка. Пожалуйста, повторите попытку позже."
+            )
+
+        finally:
+            UPSTREAM_DURATION.observe(time.perf_counter() - started, path.split('/', 1)[0], outcome)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_provider_client() -> ExchangeRateClient:
+    """Функция для получения общего для процесса клиента стороннего сервиса."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = ExchangeRateClient()
+    return _client
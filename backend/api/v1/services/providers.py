@@ -0,0 +1,167 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils.module_loading import import_string
+from rest_framework import status
+
+from .async_provider import get_async_provider_client
+from .exceptions import CurrencyServiceException
+from .provider import get_provider_client
+from .rate_graph import CurrencyGraph
+
+logger = logging.getLogger(__name__)
+
+
+class RateProvider:
+    """
+    Базовый класс источника курсов для settings.RATES_PROVIDERS.
+
+    Провайдер отдаёт одну или несколько таблиц курсов: таблицу относительно запрошенной базовой валюты
+    и/или таблицы относительно тех валют, которые он котирует сам. Недостающие пары достраиваются
+    в графе валют (CurrencyGraph).
+    """
+
+    def tables(self, base_currency: str):
+        """
+        Метод для получения таблиц курсов.
+        :param base_currency: Код базовой валюты, относительно которой нужны курсы.
+        :return: Кортеж (tables, fetched_at): {код базовой валюты: {код валюты: курс}} и время получения таблиц.
+        """
+        raise NotImplementedError
+
+    async def atables(self, base_currency: str):
+        """Асинхронный вариант tables; по умолчанию tables выполняется в пуле потоков."""
+        return await sync_to_async(self.tables, thread_sensitive=False)(base_currency)
+
+
+class ExchangeRateProvider(RateProvider):
+    """Сторонний сервис курсов (BASE_URL): одна таблица /latest/{base} через общий клиент процесса."""
+
+    def tables(self, base_currency: str):
+        return {base_currency: get_provider_client().latest(base_currency)}, time.time()
+
+    async def atables(self, base_currency: str):
+        return {base_currency: await get_async_provider_client().latest(base_currency)}, time.time()
+
+
+class StaticFileProvider(RateProvider):
+    """
+    Курсы из локального JSON-файла (settings.RATES_STATIC_FILE) — для тестов, нагрузочных прогонов
+    и ручного дополнения курсов, которых нет у стороннего сервиса.
+
+    Формат файла: {код базовой валюты: {код валюты: курс}}, например {"EUR": {"HRK": 7.5345}}.
+    Временем получения таблиц считается время изменения файла; файл перечитывается, только если он изменился.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or settings.RATES_STATIC_FILE
+        self._cache = None
+        self._lock = threading.Lock()
+
+    def tables(self, base_currency: str):
+        try:
+            mtime = os.stat(self.path).st_mtime
+            with self._lock:
+                if self._cache is None or self._cache[1] != mtime:
+                    with open(self.path, encoding='utf-8') as file:
+                        self._cache = ({base.upper(): rates for base, rates in json.load(file).items()}, mtime)
+                return self._cache
+        except (OSError, ValueError, AttributeError) as e:
+            logger.error(f"Failed to read static rates file {self.path}: {e}")
+            raise CurrencyServiceException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Не удалось получить таблицу курсов для {base_currency}"
+            )
+
+    async def atables(self, base_currency: str):
+        return self.tables(base_currency)
+
+
+class ProviderChain:
+    """
+    Источник таблицы курсов для RateTableEngine, объединяющий несколько провайдеров.
+
+    Таблицы всех провайдеров складываются в граф валют, и для каждой валюты заранее выбирается путь
+    к базовой: напрямую или через промежуточные валюты (settings.RATES_GRAPH_HUBS) по правилу
+    settings.RATES_PATH_POLICY. Результат — обычная таблица относительно базовой валюты, поэтому
+    курс любой пары при запросе по-прежнему вычисляется одним делением.
+    Провайдер, который не ответил, пропускается; ошибка возвращается, только если не ответил ни один.
+    """
+
+    def __init__(self, providers: list = None, hubs: tuple = None, policy: str = None):
+        self.providers = providers if providers is not None else [
+            import_string(path)() for path in settings.RATES_PROVIDERS
+        ]
+        self.hubs = tuple(settings.RATES_GRAPH_HUBS if hubs is None else hubs)
+        self.policy = policy or settings.RATES_PATH_POLICY
+
+    def latest(self, base_currency: str) -> dict:
+        """
+        Метод для получения таблицы курсов от всех провайдеров.
+        :param base_currency: Код базовой валюты (строка).
+        :return: Словарь {код валюты: курс} относительно base_currency.
+        """
+        results = []
+        for provider in self.providers:
+            try:
+                results.append(provider.tables(base_currency))
+            except CurrencyServiceException as e:
+                results.append(e)
+        return self._merge(base_currency, results)
+
+    async def alatest(self, base_currency: str) -> dict:
+        """Асинхронный вариант latest."""
+        results = []
+        for provider in self.providers:
+            try:
+                results.append(await provider.atables(base_currency))
+            except CurrencyServiceException as e:
+                results.append(e)
+        return self._merge(base_currency, results)
+
+    def _merge(self, base_currency: str, results: list) -> dict:
+        errors = [result for result in results if isinstance(result, CurrencyServiceException)]
+        if len(errors) == len(results):
+            raise errors[0]
+        if len(results) == 1:
+            tables, _ = results[0]
+            if base_currency in tables:
+                return tables[base_currency]
+
+        graph = CurrencyGraph(hubs=self.hubs, policy=self.policy)
+        for priority, result in enumerate(results):
+            if isinstance(result, CurrencyServiceException):
+                continue
+            tables, fetched_at = result
+            for base, rates in tables.items():
+                graph.add_table(base, rates, fetched_at, priority)
+
+        rates, paths = graph.resolve(base_currency)
+        if len(rates) <= 1:
+            raise CurrencyServiceException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Не удалось получить таблицу курсов для {base_currency}"
+            )
+        indirect = sorted(code for code, path in paths.items() if len(path) > 2)
+        if indirect:
+            logger.info(f"Rates resolved through intermediate currencies: {', '.join(indirect)}")
+        return rates
+
+
+_chain = None
+_chain_lock = threading.Lock()
+
+
+def get_provider_chain() -> ProviderChain:
+    """Функция для получения общего для процесса источника курсов (settings.RATES_PROVIDERS)."""
+    global _chain
+    if _chain is None:
+        with _chain_lock:
+            if _chain is None:
+                _chain = ProviderChain()
+    return _chain
@@ -0,0 +1,134 @@
+import datetime
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from rest_framework import status
+
+from .exceptions import CurrencyServiceException
+from .metrics import Counter
+
+try:
+    import fcntl
+except ImportError:  # Windows: бюджет общий только для потоков процесса
+    fcntl = None
+
+BUDGET_REJECTIONS = Counter(
+    'provider_budget_rejections_total', 'Запросы к стороннему сервису, отклонённые бюджетом запросов.', ('limit',)
+)
+
+
+def quota_exceeded_error(limit: str) -> CurrencyServiceException:
+    """Ошибка, когда запрос к стороннему сервису превысил бы его квоту."""
+    period = 'минуту' if limit == 'minute' else 'месяц'
+    return CurrencyServiceException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Исчерпан лимит запросов к стороннему сервису курсов за {period}. Пожалуйста, повторите попытку позже.",
+        err_code='PROVIDER_QUOTA_EXCEEDED'
+    )
+
+
+class RequestBudget:
+    """
+    Бюджет запросов к стороннему сервису, общий для всех воркеров узла.
+
+    Поминутный лимит — корзина токенов ёмкостью per_minute, которая пополняется со скоростью per_minute в минуту.
+    Месячный лимит — счётчик запросов за календарный месяц (UTC). Состояние хранится в отображённом в память
+    файле и меняется под flock. Нулевой лимит не ограничивает запросы.
+
+    Формат файла: токены (double), время их пересчёта (double), месяц ГГГГММ (int64), запросов за месяц (int64).
+    """
+    STATE = struct.Struct('<ddqq')
+
+    def __init__(self, per_minute: int = None, per_month: int = None, path: str = None):
+        self.per_minute = settings.PROVIDER_RATE_LIMIT_PER_MINUTE if per_minute is None else per_minute
+        self.per_month = settings.PROVIDER_QUOTA_PER_MONTH if per_month is None else per_month
+        self.path = path or settings.PROVIDER_BUDGET_FILE or self.default_path()
+        self._mmap = None
+        self._fd = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_path() -> str:
+        directory = settings.RATES_SHARED_STORE_DIR or ('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir())
+        return os.path.join(directory, 'currency_provider_budget.bin')
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.per_minute or self.per_month)
+
+    def acquire(self):
+        """
+        Метод для списания одного запроса из бюджета.
+        :raises CurrencyServiceException: 503 PROVIDER_QUOTA_EXCEEDED, если лимит исчерпан.
+        """
+        if not self.enabled:
+            return
+
+        buf = self._map()
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                tokens, updated_at, month, used = self.STATE.unpack_from(buf, 0)
+                now = time.time()
+                today = datetime.datetime.fromtimestamp(now, tz=datetime.timezone.utc)
+                current_month = today.year * 100 + today.month
+                if month != current_month:
+                    month, used = current_month, 0
+
+                if self.per_minute:
+                    if not updated_at:
+                        tokens = self.per_minute
+                    else:
+                        tokens = min(self.per_minute, tokens + (now - updated_at) * self.per_minute / 60)
+                    if tokens < 1:
+                        self.STATE.pack_into(buf, 0, tokens, now, month, used)
+                        BUDGET_REJECTIONS.inc('minute')
+                        raise quota_exceeded_error('minute')
+                    tokens -= 1
+
+                if self.per_month and used >= self.per_month:
+                    self.STATE.pack_into(buf, 0, tokens + bool(self.per_minute), now, month, used)
+                    BUDGET_REJECTIONS.inc('month')
+                    raise quota_exceeded_error('month')
+
+                self.STATE.pack_into(buf, 0, tokens, now, month, used + 1)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _map(self) -> mmap.mmap:
+        # Файл открывается заново в каждом процессе, как в SharedMemoryRateStore._map: flock на дескрипторе,
+        # унаследованном от мастера gunicorn, не исключал бы одновременное списание в других воркерах
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                    if os.fstat(fd).st_size < self.STATE.size:
+                        os.ftruncate(fd, self.STATE.size)
+                    inherited, self._fd = self._fd, fd
+                    self._mmap = mmap.mmap(fd, self.STATE.size)
+                    self._pid = os.getpid()
+                    if inherited is not None:
+                        os.close(inherited)
+        return self._mmap
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def get_request_budget() -> RequestBudget:
+    """Функция для получения общего для процесса бюджета запросов к стороннему сервису."""
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                _budget = RequestBudget()
+    return _budget
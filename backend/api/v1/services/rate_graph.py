@@ -0,0 +1,85 @@
+import heapq
+import math
+import time
+
+CHEAPEST = 'cheapest'
+FRESHEST = 'freshest'
+
+
+class CurrencyGraph:
+    """
+    Граф валют, собранный из таблиц курсов нескольких провайдеров.
+
+    Вершины — коды валют, рёбра — курсы из таблиц: таблица с базой B даёт рёбра B→X с курсом rates[X]
+    и обратные X→B с курсом 1 / rates[X]. Курс валюты, которой нет в таблице базовой валюты,
+    вычисляется по пути через промежуточные валюты (hubs), например USD→EUR→X.
+
+    Правило выбора пути (policy):
+    - cheapest — путь с наименьшим числом переходов, при равенстве — по таблицам провайдеров с более высоким
+      приоритетом (меньший номер);
+    - freshest — путь, самая старая таблица которого новее, при равенстве — с наименьшим числом переходов.
+    """
+
+    def __init__(self, hubs: tuple = (), policy: str = CHEAPEST):
+        if policy not in (CHEAPEST, FRESHEST):
+            raise ValueError(f"Unknown rates path policy: {policy}")
+        self.hubs = frozenset(hubs)
+        self.policy = policy
+        self._edges = {}
+
+    def add_table(self, base: str, rates: dict, fetched_at: float, priority: int = 0):
+        """
+        Метод для добавления таблицы курсов в граф.
+        :param base: Код базовой валюты таблицы.
+        :param rates: Словарь {код валюты: курс относительно base}.
+        :param fetched_at: Время получения таблицы (unix timestamp).
+        :param priority: Приоритет провайдера (0 — основной).
+        """
+        edges = self._edges
+        for code, rate in rates.items():
+            if code == base or not isinstance(rate, (int, float)) or not math.isfinite(rate) or rate <= 0:
+                continue
+            edges.setdefault(base, []).append((code, float(rate), fetched_at, priority))
+            edges.setdefault(code, []).append((base, 1.0 / rate, fetched_at, priority))
+
+    def resolve(self, base: str, now: float = None):
+        """
+        Метод для вычисления курсов всех достижимых валют относительно base (кратчайшие пути по policy).
+        Пути вычисляются один раз для снимка, поэтому курс любой пары при запросе — одно деление.
+        :param base: Код базовой валюты результата.
+        :param now: Текущее время для вычисления возраста таблиц.
+        :return: Кортеж (rates, paths): {код валюты: курс относительно base} и {код валюты: кортеж вершин пути}.
+        """
+        now = time.time() if now is None else now
+        freshest = self.policy == FRESHEST
+        rates = {base: 1.0}
+        paths = {base: (base,)}
+        best = {base: (0, 0) if not freshest else (0.0, 0)}
+        queue = [(best[base], base)]
+        done = set()
+
+        while queue:
+            cost, node = heapq.heappop(queue)
+            if node in done:
+                continue
+            done.add(node)
+            # Через валюту можно пройти дальше, только если это база результата или промежуточная валюта
+            if node != base and node not in self.hubs:
+                continue
+
+            for code, rate, fetched_at, priority in self._edges.get(node, ()):
+                if code in done:
+                    continue
+                if freshest:
+                    candidate = (max(cost[0], now - fetched_at), cost[1] + 1)
+                else:
+                    candidate = (cost[0] + 1, cost[1] + priority)
+                if code not in best or candidate < best[code]:
+                    best[code] = candidate
+                    # Произведение курсов округляется до 15 значащих цифр: точность курсов провайдеров ниже,
+                    # а exact_cross_rate берёт курс по его десятичной записи
+                    rates[code] = float(f'{rates[node] * rate:.15g}')
+                    paths[code] = paths[node] + (code,)
+                    heapq.heappush(queue, (candidate, code))
+
+        return rates, paths
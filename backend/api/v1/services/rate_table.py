@@ -0,0 +1,420 @@
+import logging
+import math
+import random
+import threading
+import time
+from fractions import Fraction
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework import status
+
+from .exceptions import CurrencyServiceException
+from .metrics import CACHE_REQUESTS, Gauge
+from .providers import get_provider_chain
+from .shared_store import get_rate_store
+from .single_flight import SingleFlight
+from .snapshots import load_latest_snapshot, save_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class RateTable:
+    """
+    Неизменяемый снимок таблицы курсов относительно одной базовой валюты.
+
+    Курс любой пары X→Y вычисляется как кросс-курс rates[Y] / rates[X],
+    поэтому для всех пар достаточно одной таблицы.
+
+    Атрибуты:
+    - base: Код базовой валюты таблицы.
+    - rates: Словарь {код валюты: курс относительно base}.
+    - fetched_at: Время получения таблицы (unix timestamp).
+    - stale: Таблица отдана как запасная, потому что обновить её не удалось (сторонний сервис недоступен).
+    """
+    __slots__ = ('base', 'rates', 'fetched_at', 'stale', '_exact_rates')
+
+    def __init__(self, base: str, rates: dict, fetched_at: float, stale: bool = False):
+        self.base = base
+        self.rates = rates
+        self.fetched_at = fetched_at
+        self.stale = stale
+        self._exact_rates = {}
+
+    @property
+    def age(self) -> float:
+        """Возраст таблицы в секундах."""
+        return time.time() - self.fetched_at
+
+    def cross_rate(self, from_currency: str, to_currency: str) -> float:
+        """
+        Метод для вычисления курса пары по таблице.
+        :param from_currency: Код валюты, из которой конвертируем (строка в верхнем регистре).
+        :param to_currency: Код валюты, в которую конвертируем (строка в верхнем регистре).
+        :return: Курс обмена (float) между from_currency и to_currency.
+        """
+        rates = self.rates
+        try:
+            return rates[to_currency] / rates[from_currency]
+        except (KeyError, ZeroDivisionError):
+            raise CurrencyServiceException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Не удалось получить обменный курс для {from_currency} на {to_currency}"
+            )
+
+    def exact_cross_rate(self, from_currency: str, to_currency: str) -> Fraction:
+        """
+        Метод для вычисления точного (рационального) курса пары по таблице.
+        Курсы провайдера — десятичные числа, поэтому каждый курс берётся по его десятичной записи,
+        а не по двоичному значению float.
+        :param from_currency: Код валюты, из которой конвертируем (строка в верхнем регистре).
+        :param to_currency: Код валюты, в которую конвертируем (строка в верхнем регистре).
+        :return: Курс обмена (Fraction) между from_currency и to_currency.
+        """
+        key = (from_currency, to_currency)
+        exact = self._exact_rates.get(key)
+        if exact is None:
+            self.cross_rate(from_currency, to_currency)
+            rates = self.rates
+            exact = Fraction(repr(rates[to_currency])) / Fraction(repr(rates[from_currency]))
+            self._exact_rates[key] = exact
+        return exact
+
+
+def too_stale_error() -> CurrencyServiceException:
+    """Ошибка, когда последняя таблица старше max_staleness, а новую загрузить не удалось."""
+    return CurrencyServiceException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Курсы валют устарели и не могут быть обновлены. Пожалуйста, повторите попытку позже.",
+        err_code='RATES_TOO_STALE'
+    )
+
+
+class RateTableEngine:
+    """
+    Движок, который хранит в памяти актуальную таблицу курсов и обновляет её
+    одним запросом к стороннему сервису раз в refresh_interval секунд.
+    Загруженная таблица публикуется в общее хранилище (settings.RATES_SHARED_STORE),
+    откуда её забирают остальные воркеры узла вместо повторного запроса.
+
+    Устаревшая таблица (старше refresh_interval, но моложе max_staleness) продолжает
+    отдаваться запросам, а обновление запускается в фоне (stale-while-revalidate).
+
+    Одновременные загрузки одной таблицы объединяются (single-flight) как внутри процесса,
+    так и между воркерами через блокировку в общем кеше. Чтобы таблицы разных воркеров не устаревали одновременно, обновление
+    запускается с вероятностным опережением (XFetch), пропорциональным времени загрузки.
+
+    Если таблица старше max_staleness, а сторонний сервис недоступен, при serve_stale
+    отдаётся последняя таблица с пометкой stale, иначе — ошибка RATES_TOO_STALE.
+    """
+
+    def __init__(self, base: str = None, refresh_interval: float = None, max_staleness: float = None,
+                 fetcher=None, store=None, early_expiry_beta: float = None, restorer=None, serve_stale: bool = None):
+        self.base = base or settings.RATES_BASE_CURRENCY
+        self.refresh_interval = settings.RATES_REFRESH_INTERVAL if refresh_interval is None else refresh_interval
+        self.max_staleness = settings.RATES_MAX_STALENESS if max_staleness is None else max_staleness
+        self.early_expiry_beta = (settings.RATES_EARLY_EXPIRY_BETA if early_expiry_beta is None
+                                  else early_expiry_beta)
+        self.fetcher = fetcher or get_provider_chain().latest
+        self.restorer = restorer
+        self.serve_stale = settings.RATES_SERVE_STALE if serve_stale is None else serve_stale
+        self.store = store or get_rate_store(self.base)
+        self.flight_key = f'rates_table_{self.base}'
+        self._table = None
+        self._stale_table = None
+        self._listeners = []
+        self._fetch_duration = 0.0
+        self._flight = SingleFlight(lock_timeout=settings.RATES_FETCH_LOCK_TIMEOUT)
+        self._background_lock = threading.Lock()
+
+    @property
+    def table(self):
+        """Последняя успешно загруженная таблица или None."""
+        return self._table
+
+    def add_listener(self, callback):
+        """
+        Метод для подписки на смену таблицы (загрузка, таблица другого воркера из общего хранилища, снимок).
+        :param callback: Функция callback(table); вызывается в потоке, который установил таблицу, и должна быть быстрой.
+        """
+        self._listeners.append(callback)
+
+    def _set_current(self, table: RateTable):
+        self._table = table
+        # Снимок нужен только до первой таблицы, откуда бы она ни пришла (загрузка, общее хранилище, сам снимок)
+        self.restorer = None
+        for callback in self._listeners:
+            try:
+                callback(table)
+            except Exception:
+                logger.exception("Rates table listener failed")
+
+    def get_table(self) -> RateTable:
+        """
+        Метод для получения таблицы курсов.
+        Свежая таблица отдаётся сразу, устаревшая отдаётся с запуском фонового обновления.
+        Если таблицы нет или она старше max_staleness, загрузка выполняется синхронно.
+        :return: Объект RateTable.
+        """
+        table = self.peek()
+        if table is not None:
+            return table
+
+        try:
+            return self.refresh()
+        except CurrencyServiceException as e:
+            return self.stale_fallback(e)
+
+    def stale_fallback(self, error: CurrencyServiceException) -> RateTable:
+        """
+        Метод для выбора ответа, когда таблицу старше max_staleness обновить не удалось.
+        :param error: Ошибка загрузки таблицы.
+        :return: Последняя таблица с пометкой stale, если это разрешено (serve_stale).
+        :raises CurrencyServiceException: Ошибка загрузки, если таблицы нет, иначе RATES_TOO_STALE.
+        """
+        table = self._table
+        if table is None:
+            raise error
+        if not self.serve_stale:
+            raise too_stale_error()
+
+        stale = self._stale_table
+        if stale is None or stale.fetched_at != table.fetched_at:
+            stale = self._stale_table = RateTable(table.base, table.rates, table.fetched_at, stale=True)
+        return stale
+
+    def peek(self):
+        """
+        Метод для получения таблицы без ожидания загрузки.
+        Устаревшая (но моложе max_staleness) таблица отдаётся с запуском фонового обновления.
+        :return: Объект RateTable или None, если таблицы нет или она старше max_staleness.
+        """
+        table = self._table
+        if table is None:
+            table = self._restore()
+            if table is None:
+                CACHE_REQUESTS.inc('memory', 'miss')
+                return None
+
+        age = table.age
+        if age + self._early_expiry_gap() < self.refresh_interval:
+            CACHE_REQUESTS.inc('memory', 'hit')
+            return table
+        if age < self.max_staleness:
+            CACHE_REQUESTS.inc('memory', 'stale')
+            self.refresh_in_background()
+            return table
+        CACHE_REQUESTS.inc('memory', 'miss')
+        return None
+
+    def refresh(self, force: bool = False) -> RateTable:
+        """
+        Метод для загрузки новой таблицы курсов у стороннего сервиса.
+        :param force: Загрузить таблицу, даже если текущая ещё свежая.
+        :return: Актуальный объект RateTable.
+        """
+        def load():
+            table = self._table
+            # Пока ждали своей очереди, таблицу мог обновить другой поток
+            if not force and table is not None and table.age < self.refresh_interval:
+                return table
+            return self._load()
+
+        return self._flight.do(self.flight_key, load, shared_lookup=self._shared_table)
+
+    async def arefresh(self, fetcher) -> RateTable:
+        """
+        Асинхронный вариант refresh для цикла событий.
+        Сначала проверяется общее хранилище, затем ведущий между воркерами выбирается той же блокировкой,
+        что и в refresh, и только он обращается к стороннему сервису; остальные ждут его таблицу.
+        :param fetcher: Корутинная функция fetcher(base) -> {код валюты: курс}.
+        :return: Актуальный объект RateTable.
+        """
+        # Общее хранилище может быть сетевым кешем (settings.RATES_SHARED_STORE), поэтому читается в пуле потоков
+        lookup = sync_to_async(self._fresh_table, thread_sensitive=False)
+        table = await lookup()
+        if table is not None:
+            return table
+
+        async def load():
+            started = time.monotonic()
+            rates = await fetcher(self.base)
+            return await sync_to_async(self.set_table, thread_sensitive=False)(
+                rates, fetch_duration=time.monotonic() - started
+            )
+
+        return await self._flight.ado_shared(self.flight_key, load, lookup)
+
+    def refresh_in_background(self) -> bool:
+        """
+        Метод для запуска обновления таблицы в отдельном потоке, если оно ещё не выполняется.
+        :return: True, если обновление запущено.
+        """
+        if self._flight.in_flight(self.flight_key) or not self._background_lock.acquire(blocking=False):
+            return False
+
+        def run():
+            try:
+                self.refresh(force=True)
+            except CurrencyServiceException as e:
+                logger.error(f"Background rates refresh failed: {e}")
+            finally:
+                self._background_lock.release()
+
+        threading.Thread(target=run, name='rates-refresh', daemon=True).start()
+        return True
+
+    def warm_up(self):
+        """
+        Метод для загрузки таблицы из общего хранилища или последнего снимка без обращения к стороннему сервису
+        и без фоновых потоков (например, в мастер-процессе gunicorn перед запуском воркеров).
+        :return: Объект RateTable или None, если сохранённой таблицы нет.
+        """
+        if self._table is None:
+            self._shared_table() or self._restore()
+        return self._table
+
+    def _restore(self):
+        """
+        Однократная загрузка последнего сохранённого снимка, чтобы после перезапуска не начинать с пустой таблицы.
+        Пока restorer не None, у движка ещё не было ни одной таблицы.
+        """
+        restorer, self.restorer = self.restorer, None
+        if restorer is None:
+            return None
+
+        entry = self.store.load() or restorer(self.base)
+        if entry is None or time.time() - entry[1] >= self.max_staleness:
+            CACHE_REQUESTS.inc('snapshot', 'miss')
+            return None
+        CACHE_REQUESTS.inc('snapshot', 'hit')
+
+        rates, fetched_at = entry
+        table = RateTable(base=self.base, rates=rates, fetched_at=fetched_at)
+        self._set_current(table)
+        return table
+
+    def _early_expiry_gap(self) -> float:
+        # XFetch: -delta * beta * ln(U), U из (0, 1]
+        return -self._fetch_duration * self.early_expiry_beta * math.log(1.0 - random.random())
+
+    def _shared_table(self):
+        """Таблица, опубликованная другим воркером, если она новее текущей и ещё свежая."""
+        entry = self.store.load()
+        if entry is None:
+            CACHE_REQUESTS.inc('shared', 'miss')
+            return None
+
+        rates, fetched_at = entry
+        table = self._table
+        if (table is not None and fetched_at <= table.fetched_at) or time.time() - fetched_at >= self.refresh_interval:
+            CACHE_REQUESTS.inc('shared', 'miss')
+            return None
+        CACHE_REQUESTS.inc('shared', 'hit')
+
+        table = RateTable(base=self.base, rates=rates, fetched_at=fetched_at)
+        self._set_current(table)
+        return table
+
+    def _fresh_table(self):
+        """Текущая таблица, если она ещё свежая (её мог установить другой поток), иначе таблица другого воркера."""
+        table = self._table
+        if table is not None and table.age < self.refresh_interval:
+            return table
+        return self._shared_table()
+
+    def set_table(self, rates: dict, fetch_duration: float = None) -> RateTable:
+        """
+        Метод для установки загруженной таблицы и её публикации для остальных воркеров.
+        :param rates: Словарь {код валюты: курс относительно base}.
+        :param fetch_duration: Длительность загрузки в секундах (для досрочного обновления).
+        :return: Новый объект RateTable.
+        """
+        if fetch_duration is not None:
+            self._fetch_duration = fetch_duration
+
+        table = RateTable(base=self.base, rates=rates, fetched_at=time.time())
+        self._set_current(table)
+        self.store.publish(table.rates, table.fetched_at, timeout=self.max_staleness)
+        return table
+
+    def _load(self) -> RateTable:
+        started = time.monotonic()
+        rates = self.fetcher(self.base)
+        return self.set_table(rates, fetch_duration=time.monotonic() - started)
+
+
+class RateRefresher(threading.Thread):
+    """
+    Фоновый поток, который по расписанию обновляет таблицу курсов,
+    чтобы запросы всегда обслуживались из памяти.
+    После каждого обновления вызывается on_refresh(base, rates, fetched_at), например, для сохранения снимка.
+    """
+
+    def __init__(self, engine: RateTableEngine, interval: float = None, retry_interval: float = None,
+                 on_refresh=None):
+        super().__init__(name='rates-refresher', daemon=True)
+        self.engine = engine
+        self.on_refresh = on_refresh
+        self.interval = engine.refresh_interval if interval is None else interval
+        self.retry_interval = settings.RATES_REFRESH_RETRY_INTERVAL if retry_interval is None else retry_interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                table = self.engine.refresh(force=True)
+                if self.on_refresh is not None:
+                    self.on_refresh(table.base, table.rates, table.fetched_at)
+                delay = self.interval
+            except CurrencyServiceException as e:
+                logger.error(f"Scheduled rates refresh failed: {e}")
+                delay = self.retry_interval
+            except Exception:
+                # Любая другая ошибка (публикация в общее хранилище, сохранение снимка) не должна останавливать поток
+                logger.exception("Scheduled rates refresh failed")
+                delay = self.retry_interval
+            self._stop_event.wait(delay)
+
+    def stop(self):
+        """Метод для остановки потока обновления."""
+        self._stop_event.set()
+
+
+_engine = None
+
+
+def get_rate_engine() -> RateTableEngine:
+    """Функция для получения общего для процесса движка таблицы курсов."""
+    global _engine
+    if _engine is None:
+        _engine = RateTableEngine(restorer=load_latest_snapshot if settings.RATES_SNAPSHOTS_ENABLED else None)
+    return _engine
+
+
+def _table_age():
+    table = _engine.table if _engine is not None else None
+    return None if table is None else table.age
+
+
+def _refresher_lag():
+    age = _table_age()
+    return None if age is None else max(0.0, age - _engine.refresh_interval)
+
+
+Gauge('rates_table_age_seconds', 'Возраст таблицы курсов в памяти воркера.', _table_age)
+Gauge('rates_refresher_lag_seconds', 'На сколько таблица курсов старше интервала обновления.', _refresher_lag)
+
+_refresher = None
+
+
+def start_rate_refresher() -> RateRefresher:
+    """Функция для запуска фонового обновления курсов (не более одного потока на процесс)."""
+    global _refresher
+    if _refresher is None or not _refresher.is_alive():
+        _refresher = RateRefresher(
+            engine=get_rate_engine(),
+            on_refresh=save_snapshot if settings.RATES_SNAPSHOTS_ENABLED else None
+        )
+        _refresher.start()
+    return _refresher
@@ -0,0 +1,165 @@
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache as default_cache
+from django.utils.module_loading import import_string
+
+try:
+    import fcntl
+except ImportError:  # Windows: блокировка между процессами недоступна
+    fcntl = None
+
+
+class LocalRateStore:
+    """Хранилище таблицы курсов в памяти процесса, без обмена между воркерами."""
+
+    def __init__(self, base: str = None):
+        self._entry = None
+
+    def load(self):
+        """
+        Метод для чтения опубликованной таблицы.
+        :return: Кортеж (rates, fetched_at) или None, если таблица не опубликована.
+        """
+        return self._entry
+
+    def publish(self, rates: dict, fetched_at: float, timeout: float = None):
+        """
+        Метод для сохранения таблицы.
+        :param rates: Словарь {код валюты: курс}.
+        :param fetched_at: Время получения таблицы (unix timestamp).
+        :param timeout: Не используется.
+        """
+        self._entry = (rates, fetched_at)
+
+
+class CacheRateStore:
+    """Хранилище опубликованной таблицы курсов в кеше Django (CACHES['default'])."""
+
+    def __init__(self, base: str, cache=None):
+        self.cache = cache or default_cache
+        self.cache_key = f'rates_table_{base}'
+
+    def load(self):
+        """
+        Метод для чтения опубликованной таблицы.
+        :return: Кортеж (rates, fetched_at) или None, если таблица не опубликована.
+        """
+        return self.cache.get(self.cache_key)
+
+    def publish(self, rates: dict, fetched_at: float, timeout: float = None):
+        """
+        Метод для публикации таблицы для остальных воркеров.
+        :param rates: Словарь {код валюты: курс}.
+        :param fetched_at: Время получения таблицы (unix timestamp).
+        :param timeout: Время жизни записи в секундах.
+        """
+        self.cache.set(self.cache_key, (rates, fetched_at), timeout=timeout)
+
+
+class SharedMemoryRateStore:
+    """
+    Хранилище таблицы курсов в отображённом в память файле (по умолчанию в /dev/shm),
+    общее для всех воркеров на узле и не требующее внешних сервисов.
+
+    Формат файла: заголовок (счётчик версии, fetched_at, число валют), затем коды валют
+    по 3 байта и массив курсов float64. Запись выполняется под flock, а чтение без блокировок
+    по схеме seqlock: нечётный счётчик означает, что запись ещё идёт.
+    """
+    HEADER = struct.Struct('<QdI')
+    CODE_SIZE = 3
+    RATE = struct.Struct('<d')
+
+    def __init__(self, base: str, path: str = None, capacity: int = None):
+        self.path = path or self.default_path(base)
+        self.capacity = capacity or settings.RATES_SHARED_STORE_CAPACITY
+        self._codes_offset = self.HEADER.size
+        self._rates_offset = self._codes_offset + self.CODE_SIZE * self.capacity
+        self._size = self._rates_offset + self.RATE.size * self.capacity
+        self._mmap = None
+        self._fd = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_path(base: str) -> str:
+        directory = settings.RATES_SHARED_STORE_DIR or ('/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir())
+        return os.path.join(directory, f'currency_rates_{base}.bin')
+
+    @property
+    def version(self) -> int:
+        """Счётчик версии таблицы; меняется при каждой публикации."""
+        return self.HEADER.unpack_from(self._map(), 0)[0]
+
+    def load(self):
+        """
+        Метод для чтения опубликованной таблицы.
+        :return: Кортеж (rates, fetched_at) или None, если таблица не опубликована.
+        """
+        buf = self._map()
+        for _ in range(100):
+            seq, fetched_at, count = self.HEADER.unpack_from(buf, 0)
+            if seq == 0:
+                return None
+            if seq % 2:
+                time.sleep(0)  # запись ещё идёт
+                continue
+
+            codes = bytes(buf[self._codes_offset:self._codes_offset + self.CODE_SIZE * count])
+            values = struct.unpack_from(f'<{count}d', buf, self._rates_offset)
+
+            if self.HEADER.unpack_from(buf, 0)[0] == seq:
+                codes = codes.decode('ascii')
+                return {codes[i * 3:i * 3 + 3]: values[i] for i in range(count)}, fetched_at
+        return None
+
+    def publish(self, rates: dict, fetched_at: float, timeout: float = None):
+        """
+        Метод для публикации таблицы для остальных воркеров.
+        :param rates: Словарь {код валюты: курс}.
+        :param fetched_at: Время получения таблицы (unix timestamp).
+        :param timeout: Не используется: таблица хранится до следующей публикации.
+        """
+        items = [(code, rate) for code, rate in rates.items() if len(code) == self.CODE_SIZE][:self.capacity]
+        codes = ''.join(code for code, _ in items).encode('ascii')
+        values = struct.pack(f'<{len(items)}d', *(rate for _, rate in items))
+
+        buf = self._map()
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                seq = self.HEADER.unpack_from(buf, 0)[0]
+                self.HEADER.pack_into(buf, 0, seq + 1, fetched_at, len(items))
+                buf[self._codes_offset:self._codes_offset + len(codes)] = codes
+                buf[self._rates_offset:self._rates_offset + len(values)] = values
+                self.HEADER.pack_into(buf, 0, seq + 2, fetched_at, len(items))
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _map(self) -> mmap.mmap:
+        # Файл открывается заново в каждом процессе: flock принадлежит описанию открытого файла, и дескриптор,
+        # унаследованный от мастера gunicorn (preload_app), не исключал бы одновременную запись других воркеров
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                    if os.fstat(fd).st_size < self._size:
+                        os.ftruncate(fd, self._size)
+                    inherited, self._fd = self._fd, fd
+                    self._mmap = mmap.mmap(fd, self._size)
+                    self._pid = os.getpid()
+                    if inherited is not None:
+                        os.close(inherited)
+        return self._mmap
+
+
+def get_rate_store(base: str):
+    """Функция для создания хранилища таблицы курсов, заданного в settings.RATES_SHARED_STORE."""
+    return import_string(settings.RATES_SHARED_STORE)(base=base)
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows: вызовы объединяются только внутри процесса
+    fcntl = None
+
+
+class _Call:
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Объединение одновременных запросов за одним и тем же ключом в один вызов.
+
+    Внутри процесса ожидающие потоки получают результат (или исключение) ведущего потока.
+    Между процессами (воркерами gunicorn на узле) ведущий выбирается flock на файле блокировки ключа,
+    а остальные ждут, пока результат появится в общем хранилище. Блокировка атомарна и снимается ядром,
+    даже если ведущий процесс завершился аварийно.
+    """
+
+    def __init__(self, lock_dir: str = None, lock_timeout: float = 30, poll_interval: float = 0.05):
+        self.lock_dir = lock_dir or settings.RATES_SHARED_STORE_DIR or (
+            '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+        )
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def in_flight(self, key: str) -> bool:
+        """Метод для проверки, выполняется ли сейчас вызов по ключу в этом процессе."""
+        return key in self._calls
+
+    def do(self, key: str, fn, shared_lookup=None):
+        """
+        Метод для выполнения fn не более одного раза одновременно для ключа key.
+        :param key: Ключ, по которому объединяются вызовы.
+        :param fn: Функция без аргументов, выполняющая запрос.
+        :param shared_lookup: Функция без аргументов, возвращающая результат, опубликованный
+            другим процессом, или None. Без неё блокировка между процессами не используется.
+        :return: Результат fn (или shared_lookup).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            if shared_lookup is None:
+                call.result = fn()
+            else:
+                call.result = self._do_shared(key, fn, shared_lookup)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def _do_shared(self, key, fn, shared_lookup):
+        if fcntl is None:
+            return fn()
+
+        # Файл открывается на каждый вызов: flock принадлежит описанию открытого файла, поэтому дескриптор
+        # нельзя делить между процессами (например, унаследовать через fork) или потоками
+        fd = os.open(self._lock_path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            deadline = time.monotonic() + self.lock_timeout
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    # Запрос уже выполняет другой процесс: ждём его результат в общем хранилище
+                    result = shared_lookup()
+                    if result is not None:
+                        return result
+                    if time.monotonic() >= deadline:
+                        return fn()
+                    time.sleep(self.poll_interval)
+
+            # Результат мог появиться, пока мы ждали блокировку
+            result = shared_lookup()
+            if result is not None:
+                return result
+            return fn()
+        finally:
+            os.close(fd)  # снимает блокировку
+
+    async def ado_shared(self, key: str, fn, shared_lookup):
+        """
+        Асинхронный вариант do для загрузок из цикла событий: ведущий между процессами выбирается тем же flock,
+        а ожидание результата не блокирует цикл событий. Вызовы внутри цикла событий объединяет вызывающий.
+        :param key: Ключ, по которому объединяются вызовы.
+        :param fn: Корутинная функция без аргументов, выполняющая запрос.
+        :param shared_lookup: Корутинная функция без аргументов, возвращающая результат, опубликованный
+            другим процессом, или None.
+        :return: Результат fn (или shared_lookup).
+        """
+        if fcntl is None:
+            return await fn()
+
+        fd = os.open(self._lock_path(key), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            deadline = time.monotonic() + self.lock_timeout
+            while True:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    result = await shared_lookup()
+                    if result is not None:
+                        return result
+                    if time.monotonic() >= deadline:
+                        return await fn()
+                    await asyncio.sleep(self.poll_interval)
+
+            result = await shared_lookup()
+            if result is not None:
+                return result
+            return await fn()
+        finally:
+            os.close(fd)
+
+    def _lock_path(self, key: str) -> str:
+        digest = hashlib.sha1(key.encode()).hexdigest()[:16]
+        return os.path.join(self.lock_dir, f'single_flight_{digest}.lock')
@@ -0,0 +1,108 @@
+import datetime
+import logging
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.utils import timezone
+from rest_framework import status
+
+from api.models import RateSnapshot
+
+from .exceptions import CurrencyServiceException
+from .metrics import Gauge
+
+logger = logging.getLogger(__name__)
+
+
+def save_snapshot(base: str, rates: dict, fetched_at: float):
+    """
+    Функция для сохранения снимка таблицы курсов в БД.
+    Повторное сохранение той же таблицы (её мог загрузить и другой воркер) ничего не меняет.
+    Вместе с новым снимком удаляются снимки старше settings.RATES_SNAPSHOTS_RETENTION_DAYS.
+    :param base: Код базовой валюты.
+    :param rates: Словарь {код валюты: курс}.
+    :param fetched_at: Время получения таблицы (unix timestamp).
+    """
+    codes, packed = RateSnapshot.pack(rates)
+    fetched_at = datetime.datetime.fromtimestamp(fetched_at, tz=datetime.timezone.utc)
+    try:
+        _, created = RateSnapshot.objects.get_or_create(
+            base=base, fetched_at=fetched_at, defaults={'codes': codes, 'rates': packed}
+        )
+        if created and settings.RATES_SNAPSHOTS_RETENTION_DAYS:
+            cutoff = fetched_at - datetime.timedelta(days=settings.RATES_SNAPSHOTS_RETENTION_DAYS)
+            RateSnapshot.objects.filter(base=base, fetched_at__lt=cutoff).delete()
+    except DatabaseError as e:
+        logger.error(f"Failed to save rates snapshot: {e}")
+    finally:
+        close_old_connections()
+
+
+def load_latest_snapshot(base: str):
+    """
+    Функция для загрузки последнего снимка (например, для прогрева воркера после перезапуска).
+    :param base: Код базовой валюты.
+    :return: Кортеж (rates, fetched_at) или None, если снимков нет или БД недоступна.
+    """
+    try:
+        snapshot = RateSnapshot.objects.filter(base=base).order_by('-fetched_at').first()
+    except DatabaseError as e:
+        logger.error(f"Failed to load rates snapshot: {e}")
+        return None
+    finally:
+        close_old_connections()
+
+    if snapshot is None:
+        return None
+    return snapshot.unpack(), snapshot.fetched_at.timestamp()
+
+
+def load_snapshot_on(base: str, date: datetime.date):
+    """
+    Функция для загрузки курсов на дату: последний снимок, сделанный не позже конца этого дня.
+    Поиск выполняется по индексу (base, fetched_at) без обращения к стороннему сервису.
+    :param base: Код базовой валюты.
+    :param date: Дата (в часовом поясе TIME_ZONE).
+    :return: Кортеж (rates, fetched_at).
+    :raises CurrencyServiceException: 404, если снимка нет; 503, если БД недоступна.
+    """
+    end_of_day = datetime.datetime.combine(
+        date + datetime.timedelta(days=1), datetime.time.min, tzinfo=timezone.get_current_timezone()
+    )
+    try:
+        snapshot = RateSnapshot.objects.filter(base=base, fetched_at__lt=end_of_day).order_by('-fetched_at').first()
+    except DatabaseError as e:
+        logger.error(f"Failed to load rates snapshot: {e}")
+        raise CurrencyServiceException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Сохранённые курсы временно недоступны. Пожалуйста, повторите попытку позже.",
+            err_code='SNAPSHOTS_UNAVAILABLE'
+        )
+
+    if snapshot is None:
+        raise CurrencyServiceException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Нет сохранённых курсов на дату {date:%Y-%m-%d}",
+            err_code='RATES_NOT_FOUND'
+        )
+    return snapshot.unpack(), snapshot.fetched_at.timestamp()
+
+
+def latest_snapshot_age():
+    """
+    Функция для вычисления возраста последнего снимка базовой валюты (settings.RATES_BASE_CURRENCY).
+    :return: Возраст в секундах или None, если снимки отключены, их нет или БД недоступна.
+    """
+    if not settings.RATES_SNAPSHOTS_ENABLED:
+        return None
+    try:
+        fetched_at = (RateSnapshot.objects.filter(base=settings.RATES_BASE_CURRENCY)
+                      .order_by('-fetched_at').values_list('fetched_at', flat=True).first())
+    except DatabaseError as e:
+        logger.error(f"Failed to load rates snapshot: {e}")
+        return None
+    return None if fetched_at is None else time.time() - fetched_at.timestamp()
+
+
+Gauge('rates_snapshot_age_seconds', 'Возраст последнего сохранённого снимка курсов.', latest_snapshot_age)
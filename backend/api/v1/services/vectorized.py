@@ -0,0 +1,122 @@
+import decimal
+import threading
+from decimal import Decimal
+
+import numpy as np
+
+from .currencies import CODES, INDEX
+from .money import MINOR_UNITS, convert_amount, get_rounding
+from .rate_table import RateTable
+
+
+# Округление массива до целого для каждого режима decimal
+_ROUNDERS = {
+    decimal.ROUND_HALF_EVEN: np.rint,
+    decimal.ROUND_HALF_UP: np.rint,
+    decimal.ROUND_HALF_DOWN: np.rint,
+    decimal.ROUND_FLOOR: np.floor,
+    decimal.ROUND_CEILING: np.ceil,
+    decimal.ROUND_DOWN: np.trunc,
+    decimal.ROUND_UP: lambda values: np.copysign(np.ceil(np.abs(values)), values),
+}
+_HALF_MODES = frozenset({decimal.ROUND_HALF_EVEN, decimal.ROUND_HALF_UP, decimal.ROUND_HALF_DOWN})
+
+
+class VectorConverter:
+    """
+    Векторная конвертация по таблице курсов.
+
+    Таблица хранится плотным вектором float64, индексированным кодами валют из DB_VALUES (см. currencies.INDEX),
+    поэтому конвертация массивов индексов и сумм выполняется за один проход NumPy.
+
+    Результат совпадает с точной конвертацией money.convert_amount: сумма в минорных единицах
+    валюты назначения считается в float64 с ошибкой в несколько ulp, поэтому округление верно везде,
+    кроме элементов у самой границы округления (и слишком больших для точного представления целых).
+    Такие элементы досчитываются точно в целых числах.
+    """
+
+    def __init__(self, table: RateTable, rounding: str = None):
+        self.table = table
+        self.rounding = rounding or get_rounding()
+        self.rates = np.array([table.rates.get(code, np.nan) for code in CODES], dtype=np.float64)
+        self.scales = np.array([10.0 ** MINOR_UNITS[code] for code in CODES], dtype=np.float64)
+        self._round = _ROUNDERS[self.rounding]
+
+    def convert(self, from_indices: np.ndarray, to_indices: np.ndarray, amounts: np.ndarray) -> tuple:
+        """
+        Метод для конвертации массивов за один проход.
+        :param from_indices: Массив индексов валют, из которых конвертируем (см. currencies.INDEX).
+        :param to_indices: Массив индексов валют, в которые конвертируем.
+        :param amounts: Массив сумм (float64).
+        :return: Кортеж (results, risky): суммы, округлённые до минорных единиц валют назначения
+                 (NaN, если курса нет в таблице), и булев массив элементов, которые нужно досчитать точно.
+        """
+        rates = self.rates
+        scales = self.scales[to_indices]
+        with np.errstate(invalid='ignore', divide='ignore', over='ignore'):
+            scaled = amounts * (rates[to_indices] / rates[from_indices]) * scales
+            results = self._round(scaled) / scales
+
+            magnitude = np.abs(scaled)
+            if self.rounding in _HALF_MODES:
+                distance = np.abs(scaled - np.floor(scaled) - 0.5)
+            else:
+                distance = np.abs(scaled - np.rint(scaled))
+            risky = (distance <= 16 * np.spacing(magnitude)) | ~(magnitude < 2.0 ** 52)
+            risky &= np.isfinite(scaled)
+        return results, risky
+
+    def missing(self, from_indices: np.ndarray, to_indices: np.ndarray) -> np.ndarray:
+        """
+        Метод для поиска пар, курса которых нет в таблице.
+        :param from_indices: Массив индексов валют, из которых конвертируем.
+        :param to_indices: Массив индексов валют, в которые конвертируем.
+        :return: Булев массив: True, если курс пары вычислить нельзя.
+        """
+        rates = self.rates
+        return np.isnan(rates[from_indices]) | np.isnan(rates[to_indices]) | (rates[from_indices] == 0)
+
+    def convert_items(self, items: list) -> list:
+        """
+        Метод для конвертации списка проверенных элементов.
+        :param items: Список кортежей (from_currency, to_currency, value) с кодами из DB_VALUES и суммой Decimal.
+        :return: Список той же длины: сумма (Decimal), округлённая до минорных единиц валюты назначения,
+                 или None, если курса пары нет в таблице.
+        """
+        count = len(items)
+        from_indices = np.fromiter((INDEX[item[0]] for item in items), dtype=np.intp, count=count)
+        to_indices = np.fromiter((INDEX[item[1]] for item in items), dtype=np.intp, count=count)
+        amounts = np.fromiter((item[2] for item in items), dtype=np.float64, count=count)
+
+        results, risky = self.convert(from_indices, to_indices, amounts)
+        # Вне risky сумма в минорных единицах — целое меньше 2**52, поэтому восстанавливается из float точно;
+        # значения на местах risky и пар без курса ниже заменяются
+        with np.errstate(invalid='ignore'):
+            units = np.rint(results * self.scales[to_indices]).astype(np.int64).tolist()
+        results = [Decimal(f'{unit}E-{MINOR_UNITS[item[1]]}') for item, unit in zip(items, units)]
+        for position in np.flatnonzero(risky).tolist():
+            from_currency, to_currency, amount = items[position]
+            results[position] = convert_amount(self.table, from_currency, to_currency, amount, self.rounding)
+
+        missing = self.missing(from_indices, to_indices)
+        if missing.any():
+            for position in np.flatnonzero(missing):
+                results[position] = None
+        return results
+
+
+_cache = (None, None)
+_cache_lock = threading.Lock()
+
+
+def get_vector_converter(table: RateTable) -> VectorConverter:
+    """Функция для получения VectorConverter текущей таблицы (вектор строится один раз на таблицу)."""
+    global _cache
+    cached_table, converter = _cache
+    if cached_table is not table:
+        with _cache_lock:
+            cached_table, converter = _cache
+            if cached_table is not table:
+                converter = VectorConverter(table)
+                _cache = (table, converter)
+    return converter
@@ -1,6 +1,17 @@
 from django.urls import path
-from .views.converter_views import CurrencyConverterView
+
+from .views.async_converter_views import AsyncCurrencyConverterView
+from .views.converter_views import (BatchCurrencyConverterView, CurrencyConverterView, FileCurrencyConverterView,
+                                   MatrixCurrencyConverterView)
+from .views.currency_views import CurrencyListView
+from .views.stream_views import RateStreamView
 
 urlpatterns = [
     path('rates/', CurrencyConverterView.as_view(), name='currency_converter'),
-]
\ No newline at end of file
+    path('rates/matrix/', MatrixCurrencyConverterView.as_view(), name='currency_converter_matrix'),
+    path('rates/batch/', BatchCurrencyConverterView.as_view(), name='currency_converter_batch'),
+    path('rates/file/', FileCurrencyConverterView.as_view(), name='currency_converter_file'),
+    path('rates/async/', AsyncCurrencyConverterView.as_view(), name='currency_converter_async'),
+    path('rates/stream/', RateStreamView.as_view(), name='currency_rates_stream'),
+    path('currencies/', CurrencyListView.as_view(), name='currency_list'),
+]
@@ -0,0 +1,52 @@
+import logging
+import time
+
+from django.http import JsonResponse
+from django.views import View
+
+from ..services import AsyncCurrencyService, CurrencyServiceException
+from ..services.metrics import STAGE_DURATION
+from ..services.money import format_amount
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncCurrencyConverterView(View):
+    """
+    Асинхронный вариант GET /api/rates/ с теми же параметрами и форматом ответа.
+
+    Рассчитан на запуск под ASGI (uvicorn backend.asgi:application): пока сторонний сервис отвечает,
+    воркер продолжает обслуживать другие запросы. Синхронный /api/rates/ остаётся доступным.
+    """
+    http_method_names = ['get']
+    json_dumps_params = {'ensure_ascii': False}
+
+    async def get(self, request):
+        currency_service = AsyncCurrencyService()
+
+        try:
+            started = time.perf_counter()
+            from_currency, to_currency, value = currency_service.validate_params(
+                from_currency=request.GET.get('from'),
+                to_currency=request.GET.get('to'),
+                value=request.GET.get('value')
+            )
+            validated = time.perf_counter()
+            STAGE_DURATION.observe(validated - started, 'validate')
+
+            table = await currency_service.aget_table()
+            loaded = time.perf_counter()
+            STAGE_DURATION.observe(loaded - validated, 'table')
+
+            result = await currency_service.aconvert(
+                from_currency=from_currency, to_currency=to_currency, value=value, table=table
+            )
+            STAGE_DURATION.observe(time.perf_counter() - loaded, 'convert')
+
+            data = {'result': format_amount(result)}
+            if table.stale:
+                data['stale'] = True
+            return JsonResponse(data, json_dumps_params=self.json_dumps_params)
+        except CurrencyServiceException as e:
+            return JsonResponse({'detail': e.detail}, status=e.status_code,
+                                json_dumps_params=self.json_dumps_params)
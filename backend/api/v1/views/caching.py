@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from ..services import RateTable
+from ..services.metrics import CACHE_REQUESTS
+
+
+def rate_cache_headers(table: RateTable, immutable: bool = False, variant: str = None) -> dict:
+    """
+    Функция для формирования заголовков HTTP-кеширования ответа, вычисленного по таблице курсов.
+    Ответ меняется только вместе с таблицей, поэтому ETag и Last-Modified привязаны к её версии,
+    а max-age равен оставшемуся времени свежести таблицы.
+    :param table: Таблица курсов, по которой вычислен ответ.
+    :param immutable: Таблица больше не изменится (снимок за прошедший день).
+    :param variant: Формат ответа, если по одному адресу отдаётся несколько (например, JSON и MessagePack):
+                    добавляется к ETag и заголовку Vary, чтобы кеши не путали представления.
+    :return: Словарь заголовков.
+    """
+    if immutable:
+        max_age = settings.RATES_HISTORICAL_MAX_AGE
+    else:
+        max_age = max(0, int(settings.RATES_REFRESH_INTERVAL - (time.time() - table.fetched_at)))
+
+    headers = {
+        'ETag': f'"{table.base}-{int(table.fetched_at * 1000):x}"',
+        'Last-Modified': http_date(table.fetched_at),
+        'Cache-Control': f'public, max-age={max_age}',
+    }
+    if variant is not None:
+        headers['ETag'] = f'{headers["ETag"][:-1]}-{variant}"'
+        headers['Vary'] = 'Accept'
+    return headers
+
+
+def not_modified_response(request, table: RateTable, headers: dict):
+    """
+    Функция для обработки условного запроса (If-None-Match / If-Modified-Since).
+    :param request: Запрос.
+    :param table: Таблица курсов, по которой вычисляется ответ.
+    :param headers: Заголовки из rate_cache_headers.
+    :return: Ответ 304 с заголовками кеширования или None, если клиенту нужен полный ответ.
+    """
+    response = get_conditional_response(request, etag=headers['ETag'], last_modified=int(table.fetched_at))
+    if 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META:
+        CACHE_REQUESTS.inc('http', 'miss' if response is None else 'hit')
+    if response is not None:
+        for name, value in headers.items():
+            response[name] = value
+    return response
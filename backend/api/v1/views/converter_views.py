@@ -1,14 +1,25 @@
 import logging
+import time
 
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import OpenApiResponse, OpenApiParameter, extend_schema, OpenApiExample
 from rest_framework import status
+from rest_framework.parsers import FileUploadParser, MultiPartParser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 
-from ..serializers.converter_serializers import GetRatesSerializer, ErrorResponseSerializer
-from ..services import CurrencyServiceException, CurrencyService
-
-from django.core.cache import cache
+from ..serializers.converter_serializers import (BatchRequestSerializer, BatchResponseSerializer,
+                                                GetRatesSerializer, ErrorResponseSerializer, MatrixResponseSerializer)
+from ..renderers import MessagePackRenderer
+from ..services import BulkConverter, CurrencyServiceException, CurrencyService, open_text
+from ..services.currencies import CODES
+from ..services.money import format_amount
+from ..services.metrics import STAGE_DURATION
+from .caching import not_modified_response, rate_cache_headers
 
 logger = logging.getLogger(__name__)
 
@@ -18,7 +29,10 @@ logger = logging.getLogger(__name__)
 @extend_schema(
 
     summary="Convert currency",
-    description="Конвертация валюты из одной в другую с указанием суммы. Возвращает конвертированную сумму.",
+    description="Конвертация валюты из одной в другую с указанием суммы. Возвращает конвертированную сумму. "
+                "Ответ содержит ETag и Last-Modified версии таблицы курсов и Cache-Control с оставшимся временем "
+                "её свежести; условный запрос (If-None-Match, If-Modified-Since) получает 304, пока таблица не "
+                "обновилась.",
     methods=['GET'],
     responses={
         200: OpenApiResponse(
@@ -27,10 +41,11 @@ logger = logging.getLogger(__name__)
             examples=[
                 OpenApiExample(
                     name="Пример успешной конвертации",
-                    value={"result": 123.45}
+                    value={"result": "123.45"}
                 )
             ]
         ),
+        304: OpenApiResponse(description="Таблица курсов не изменилась (совпал ETag или Last-Modified)."),
         400: OpenApiResponse(
             description="Ошибка клиента: отсутствуют или неверные параметры.",
             response=ErrorResponseSerializer(),
@@ -61,11 +76,20 @@ logger = logging.getLogger(__name__)
                             "message": "Неверное значение параметра. Должно быть числом."
                         }
                     }
+                ),
+                OpenApiExample(
+                    name="Пример неверной даты",
+                    value={
+                        "detail": {
+                            "code": "INVALID_DATE",
+                            "message": "Неверная дата. Ожидается формат ГГГГ-ММ-ДД."
+                        }
+                    }
                 )
             ]
         ),
         404: OpenApiResponse(
-            description="Не найдена указанная валюта.",
+            description="Не найдена указанная валюта или нет сохранённых курсов на указанную дату.",
             response=ErrorResponseSerializer(),
             examples=[
                 OpenApiExample(
@@ -76,6 +100,15 @@ logger = logging.getLogger(__name__)
                             "message": "Не найдена валюта RUS. Список доступных валют ['USD', 'EUR', ...]"
                         }
                     }
+                ),
+                OpenApiExample(
+                    name="Пример отсутствующих курсов на дату",
+                    value={
+                        "detail": {
+                            "code": "RATES_NOT_FOUND",
+                            "message": "Нет сохранённых курсов на дату 2020-01-01"
+                        }
+                    }
                 )
             ]
         ),
@@ -94,6 +127,22 @@ logger = logging.getLogger(__name__)
                 )
             ]
         ),
+        503: OpenApiResponse(
+            description="Сторонний сервис курсов недоступен или исчерпан лимит запросов к нему, "
+                        "а сохранённой таблицы курсов нет; для параметра date — недоступна БД со снимками курсов.",
+            response=ErrorResponseSerializer(),
+            examples=[
+                OpenApiExample(
+                    name="Сторонний сервис недоступен",
+                    value={
+                        "detail": {
+                            "code": "PROVIDER_UNAVAILABLE",
+                            "message": "Сторонний сервис курсов временно недоступен. Пожалуйста, повторите попытку позже."
+                        }
+                    }
+                )
+            ]
+        ),
     },
 
     parameters=[
@@ -102,20 +151,27 @@ logger = logging.getLogger(__name__)
             type=str,
             description="Код валюты, из которой конвертируем",
             required=True,
-            enum=CurrencyService.DB_VALUES
+            enum=CODES
         ),
         OpenApiParameter(
             name="to",
             type=str,
             description="Код валюты, в которую конвертируем",
             required=True,
-            enum=CurrencyService.DB_VALUES
+            enum=CODES
         ),
         OpenApiParameter(
             name="value",
             type=float,
             description="Сумма для конвертации",
             required=True
+        ),
+        OpenApiParameter(
+            name="date",
+            type=OpenApiTypes.DATE,
+            description="Дата (ГГГГ-ММ-ДД), по курсам которой конвертируем. Курсы берутся из последнего "
+                        "сохранённого снимка за этот день или раньше. По умолчанию — текущие курсы.",
+            required=False
         )
     ],
 
@@ -127,70 +183,265 @@ class CurrencyConverterView(APIView):
     def get(request):
         currency_service = CurrencyService()
 
-        from_currency = request.query_params.get('from')
-        to_currency = request.query_params.get('to')
-        value = request.query_params.get('value')
-
-        if not all([from_currency, to_currency, value]):
-            return Response(
-                data={'detail': {'code': 'INVALID_PARAMETERS',
-                                 'message': 'Отсутствуют параметры. Необходимы: from, to, value'}},
-                status=status.HTTP_400_BAD_REQUEST
+        try:
+            started = time.perf_counter()
+            from_currency, to_currency, value = currency_service.validate_params(
+                from_currency=request.query_params.get('from'),
+                to_currency=request.query_params.get('to'),
+                value=request.query_params.get('value')
             )
+            date = currency_service.parse_date(request.query_params.get('date'))
+            validated = time.perf_counter()
+            STAGE_DURATION.observe(validated - started, 'validate')
 
-        if not isinstance(from_currency, str) or not isinstance(to_currency, str):
-            return Response(
-                data={
-                    'detail': {'code': 'INVALID_CURRENCY_CODE',
-                               'message': 'Неверные коды валюты. Должны быть строками.'}
-                },
-                status=status.HTTP_400_BAD_REQUEST
+            table = currency_service.get_table(date=date)
+            loaded = time.perf_counter()
+            STAGE_DURATION.observe(loaded - validated, 'table')
+
+            cache_headers = rate_cache_headers(table, immutable=date is not None and date < timezone.localdate())
+            not_modified = not_modified_response(request, table, cache_headers)
+            if not_modified is not None:
+                return not_modified
+
+            result = currency_service.convert(
+                from_currency=from_currency, to_currency=to_currency, value=value, table=table
             )
+            STAGE_DURATION.observe(time.perf_counter() - loaded, 'convert')
 
-        if not currency_service.check_currency(name_currency=from_currency):
-            return Response(
-                data={
-                    'detail': {'code': 'CURRENCY_NOT_FOUND',
-                               'message': f'Не найдена валюта {from_currency}. Список доступных валют: {currency_service.DB_VALUES}'}
-                },
-                status=status.HTTP_400_BAD_REQUEST
+            data = {'result': format_amount(result)}
+            if table.stale:
+                data['stale'] = True
+            return Response(data, headers=cache_headers)
+        except CurrencyServiceException as e:
+            return Response({'detail': e.detail}, status=e.status_code)
+
+
+@extend_schema(
+    summary="Convert currency matrix",
+    description="Конвертация одной суммы во многие валюты за один проход по таблице курсов, например, для страницы "
+                "цен. Параметр to — коды валют через запятую или * (все валюты таблицы). Заголовок "
+                "Accept: application/msgpack (или format=msgpack) возвращает ответ в формате MessagePack. "
+                "Заголовки кеширования и условные запросы — как у GET /api/rates/.",
+    methods=['GET'],
+    responses={
+        (200, 'application/json'): OpenApiResponse(
+            description="Successful Response",
+            response=MatrixResponseSerializer(),
+            examples=[
+                OpenApiExample(
+                    name="Пример конвертации во многие валюты",
+                    value={"results": {"EUR": "92.35", "GBP": "78.90", "JPY": "15612"}}
+                )
+            ]
+        ),
+        (200, 'application/msgpack'): OpenApiResponse(
+            response=OpenApiTypes.BINARY,
+            description="Тот же ответ в формате MessagePack."
+        ),
+        304: OpenApiResponse(description="Таблица курсов не изменилась (совпал ETag или Last-Modified)."),
+        400: OpenApiResponse(
+            description="Ошибка клиента: отсутствуют или неверные параметры, неизвестная валюта.",
+            response=ErrorResponseSerializer()
+        ),
+        404: OpenApiResponse(
+            description="Нет сохранённых курсов на указанную дату.",
+            response=ErrorResponseSerializer()
+        ),
+        503: OpenApiResponse(
+            description="Сторонний сервис курсов недоступен, а сохранённой таблицы курсов нет.",
+            response=ErrorResponseSerializer()
+        ),
+    },
+    parameters=[
+        OpenApiParameter(
+            name="from",
+            type=str,
+            description="Код валюты, из которой конвертируем",
+            required=True,
+            enum=CODES
+        ),
+        OpenApiParameter(
+            name="to",
+            type=str,
+            description="Коды валют, в которые конвертируем, через запятую (например, EUR,GBP,JPY) или *",
+            required=True
+        ),
+        OpenApiParameter(
+            name="value",
+            type=float,
+            description="Сумма для конвертации",
+            required=True
+        ),
+        OpenApiParameter(
+            name="date",
+            type=OpenApiTypes.DATE,
+            description="Дата (ГГГГ-ММ-ДД), по курсам которой конвертируем. По умолчанию — текущие курсы.",
+            required=False
+        )
+    ],
+    tags=['Rates']
+)
+class MatrixCurrencyConverterView(APIView):
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, MessagePackRenderer]
+
+    @staticmethod
+    def get(request):
+        currency_service = CurrencyService()
+
+        try:
+            started = time.perf_counter()
+            from_currency, to_currencies, value = currency_service.validate_matrix_params(
+                from_currency=request.query_params.get('from'),
+                to_currencies=request.query_params.get('to'),
+                value=request.query_params.get('value')
             )
+            date = currency_service.parse_date(request.query_params.get('date'))
+            validated = time.perf_counter()
+            STAGE_DURATION.observe(validated - started, 'validate')
 
-        if not currency_service.check_currency(name_currency=to_currency):
-            return Response(
-                data={
-                    'detail': {'code': 'CURRENCY_NOT_FOUND',
-                               'message': f'Не найдена валюта {to_currency}. Список доступных валют: {currency_service.DB_VALUES}'}
-                },
-                status=status.HTTP_400_BAD_REQUEST
+            table = currency_service.get_table(date=date)
+            loaded = time.perf_counter()
+            STAGE_DURATION.observe(loaded - validated, 'table')
+
+            cache_headers = rate_cache_headers(table, immutable=date is not None and date < timezone.localdate(),
+                                               variant=request.accepted_renderer.format)
+            not_modified = not_modified_response(request, table, cache_headers)
+            if not_modified is not None:
+                return not_modified
+
+            results = currency_service.convert_matrix(
+                from_currency=from_currency, to_currencies=to_currencies, value=value, table=table
             )
+            STAGE_DURATION.observe(time.perf_counter() - loaded, 'convert')
 
-        try:
-            value = float(value)
+            data = {'results': {code: format_amount(amount) for code, amount in results.items()}}
+            if table.stale:
+                data['stale'] = True
+            return Response(data, headers=cache_headers)
+        except CurrencyServiceException as e:
+            return Response({'detail': e.detail}, status=e.status_code)
+
+
+@extend_schema(
+    summary="Batch convert currency",
+    description="Пакетная конвертация: список элементов {from, to, value}. Курс каждой валютной пары вычисляется "
+                "один раз. Для каждого элемента возвращается результат или ошибка в том же порядке.",
+    methods=['POST'],
+    request=BatchRequestSerializer,
+    examples=[
+        OpenApiExample(
+            name="Пример запроса",
+            value={"items": [{"from": "USD", "to": "EUR", "value": 100}, {"from": "USD", "to": "RUS", "value": 5}]},
+            request_only=True
+        )
+    ],
+    responses={
+        200: OpenApiResponse(
+            description="Successful Response",
+            response=BatchResponseSerializer(),
+            examples=[
+                OpenApiExample(
+                    name="Пример пакетной конвертации",
+                    value={
+                        "results": [
+                            {"result": "92.35"},
+                            {"detail": {"code": "CURRENCY_NOT_FOUND",
+                                        "message": "Не найдена валюта RUS. Список доступных валют ['USD', 'EUR', ...]"}}
+                        ]
+                    }
+                )
+            ]
+        ),
+        400: OpenApiResponse(
+            description="Ошибка клиента: тело запроса не содержит список items или он слишком длинный.",
+            response=ErrorResponseSerializer(),
+            examples=[
+                OpenApiExample(
+                    name="Пример неверного тела запроса",
+                    value={
+                        "detail": {
+                            "code": "INVALID_PARAMETERS",
+                            "message": "Ожидается непустой список items не длиннее 1000 элементов."
+                        }
+                    }
+                )
+            ]
+        ),
+    },
+    tags=['Rates']
+)
+class BatchCurrencyConverterView(APIView):
+    @staticmethod
+    def post(request):
+        serializer = BatchRequestSerializer(data=request.data)
 
-        except ValueError:
+        if not serializer.is_valid():
             return Response(
-                data={
-                    'detail': {'code': 'INVALID_VALUE',
-                               'message': 'Неверное значение параметра. Должно быть числом.'},
-                },
+                data={'detail': {'code': 'INVALID_PARAMETERS',
+                                 'message': f'Ожидается непустой список items не длиннее '
+                                            f'{settings.RATES_BATCH_MAX_ITEMS} элементов.'}},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        cache_key = f'exchange_rate_{from_currency}_{to_currency}_{value}'
+        results = CurrencyService().convert_batch(items=serializer.validated_data['items'])
+        for item in results:
+            if 'result' in item:
+                item['result'] = format_amount(item['result'])
 
-        cached_result = cache.get(cache_key)
+        return Response({'results': results})
 
-        if cached_result:
-            return Response({'result': cached_result})
 
-        try:
-
-            exchange_rate = currency_service.get_exchange_rate(from_currency=from_currency, to_currency=to_currency)
-            result = round(exchange_rate * value, 2)
+@extend_schema(
+    summary="Convert currency file",
+    description="Потоковая конвертация файла CSV (колонки from,to,value) или NDJSON (объекты {from, to, value}). "
+                "Файл передаётся полем file в multipart/form-data или телом запроса с заголовком "
+                "Content-Disposition. Результат отдаётся построчно в том же формате: в CSV добавляются колонки "
+                "result и error, в NDJSON каждая строка содержит result или detail.",
+    methods=['POST'],
+    request={
+        'multipart/form-data': {
+            'type': 'object',
+            'properties': {'file': {'type': 'string', 'format': 'binary'}},
+            'required': ['file']
+        }
+    },
+    parameters=[
+        OpenApiParameter(
+            name="file_format",
+            type=str,
+            description="Формат файла. По умолчанию определяется по расширению имени файла.",
+            required=False,
+            enum=['csv', 'ndjson']
+        )
+    ],
+    responses={
+        (200, 'text/csv'): OpenApiResponse(response=OpenApiTypes.STR, description="Конвертированный файл CSV."),
+        (200, 'application/x-ndjson'): OpenApiResponse(response=OpenApiTypes.STR,
+                                                       description="Конвертированный файл NDJSON."),
+        400: OpenApiResponse(
+            description="Ошибка клиента: файл не передан, формат не поддерживается или неверный заголовок CSV.",
+            response=ErrorResponseSerializer()
+        ),
+    },
+    tags=['Rates']
+)
+class FileCurrencyConverterView(APIView):
+    parser_classes = [MultiPartParser, FileUploadParser]
+    content_types = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson; charset=utf-8'}
 
-            cache.set(cache_key, result, timeout=300)
+    def post(self, request, filename=None):
+        upload = request.data.get('file')
 
-            return Response({'result': result})
+        try:
+            if upload is None:
+                raise CurrencyServiceException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail='Отсутствует файл. Необходим параметр: file',
+                    err_code='INVALID_PARAMETERS'
+                )
+            fmt = BulkConverter.detect_format(filename=upload.name, fmt=request.query_params.get('file_format'))
+            rows = BulkConverter(currency_service=CurrencyService()).convert(lines=open_text(upload), fmt=fmt)
         except CurrencyServiceException as e:
-            return Response(e.detail, status=e.status_code)
+            return Response({'detail': e.detail}, status=e.status_code)
+
+        return StreamingHttpResponse(rows, content_type=self.content_types[fmt])
@@ -0,0 +1,41 @@
+from django.http import HttpResponse, HttpResponseNotModified
+from drf_spectacular.utils import OpenApiResponse, extend_schema, OpenApiExample
+from rest_framework.views import APIView
+
+from ..serializers.converter_serializers import CurrenciesSerializer
+from ..services.currencies import CURRENCIES_ETAG, CURRENCIES_PAYLOAD
+
+
+@extend_schema(
+    summary="List currencies",
+    description="Список доступных кодов валют. Ответ сформирован заранее и отдаётся с ETag: "
+                "при совпадении заголовка If-None-Match возвращается 304 без тела.",
+    methods=['GET'],
+    responses={
+        200: OpenApiResponse(
+            description="Successful Response",
+            response=CurrenciesSerializer(),
+            examples=[
+                OpenApiExample(
+                    name="Пример списка валют",
+                    value={"currencies": ["AED", "AFN", "ALL", "..."]}
+                )
+            ]
+        ),
+        304: OpenApiResponse(description="Список не изменился (совпал ETag)."),
+    },
+    tags=['Currencies']
+)
+class CurrencyListView(APIView):
+    authentication_classes = []
+    permission_classes = []
+
+    @staticmethod
+    def get(request):
+        if request.headers.get('If-None-Match') == CURRENCIES_ETAG:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(CURRENCIES_PAYLOAD, content_type='application/json')
+        response['ETag'] = CURRENCIES_ETAG
+        response['Cache-Control'] = 'public, max-age=86400'
+        return response
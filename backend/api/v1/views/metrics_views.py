@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views import View
+
+from ..services.metrics import CONTENT_TYPE, REGISTRY
+
+
+class MetricsView(View):
+    """
+    Метрики сервиса в текстовом формате Prometheus: запросы и время ответа по маршрутам,
+    обращения к уровням кеша курсов, запросы к стороннему сервису, ошибки по кодам,
+    возраст таблицы курсов и последнего снимка.
+    """
+    http_method_names = ['get']
+
+    @staticmethod
+    def get(request):
+        if not settings.METRICS_ENABLED:
+            raise Http404
+        return HttpResponse(REGISTRY.render(), content_type=CONTENT_TYPE)
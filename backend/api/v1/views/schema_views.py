@@ -0,0 +1,36 @@
+import hashlib
+
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.views import View
+
+
+class StaticSchemaView(View):
+    """
+    Заранее сгенерированная схема OpenAPI (settings.OPENAPI_SCHEMA_FILE) для облегчённого профиля,
+    в котором drf_spectacular не загружается. Файл читается один раз на воркер и отдаётся с ETag.
+    """
+    http_method_names = ['get']
+    _payload = None
+    _etag = None
+
+    @classmethod
+    def load(cls):
+        if cls._payload is None:
+            try:
+                with open(settings.OPENAPI_SCHEMA_FILE, 'rb') as file:
+                    payload = file.read()
+            except OSError:
+                raise Http404
+            cls._etag = f'"{hashlib.sha1(payload).hexdigest()}"'
+            cls._payload = payload
+        return cls._payload, cls._etag
+
+    def get(self, request):
+        payload, etag = self.load()
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(payload, content_type='application/json')
+        response['ETag'] = etag
+        return response
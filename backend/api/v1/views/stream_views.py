@@ -0,0 +1,77 @@
+import json
+import logging
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views import View
+from rest_framework import status
+
+from ..services import AsyncCurrencyService, CurrencyServiceException
+from ..services.broadcast import get_rate_broadcaster, pair_rate, parse_pairs
+
+logger = logging.getLogger(__name__)
+
+
+def sse_event(event: str, fetched_at: float, rates: dict) -> str:
+    """
+    Функция для формирования события Server-Sent Events.
+    :param event: Тип события: snapshot (начальные курсы) или rates (изменившиеся курсы).
+    :param fetched_at: Время загрузки таблицы, по которой вычислены курсы (Unix time).
+    :param rates: Словарь {(from, to): курс}; курс None — пара больше не поддерживается источником.
+    :return: Текст события.
+    """
+    data = json.dumps({
+        'fetched_at': fetched_at,
+        'rates': {f'{from_code}/{to_code}': rate for (from_code, to_code), rate in rates.items()},
+    }, ensure_ascii=False)
+    return f'id: {int(fetched_at * 1000)}\nevent: {event}\ndata: {data}\n\n'
+
+
+class RateStreamView(View):
+    """
+    Поток изменений курсов GET /api/rates/stream/?pairs=USD/EUR,EUR/GBP в формате Server-Sent Events.
+
+    Первым событием (snapshot) приходят текущие курсы всех пар, затем события rates только с изменившимися
+    курсами после каждого обновления таблицы. Изменения вычисляются один раз на таблицу для всех подписчиков
+    воркера (см. RateBroadcaster). Работает только под ASGI: под WSGI поток занимал бы поток воркера целиком.
+    """
+    http_method_names = ['get']
+    json_dumps_params = {'ensure_ascii': False}
+
+    async def get(self, request):
+        try:
+            if not isinstance(request, ASGIRequest):
+                raise CurrencyServiceException(
+                    status_code=status.HTTP_501_NOT_IMPLEMENTED,
+                    detail='Поток курсов доступен только при запуске под ASGI (uvicorn backend.asgi:application)',
+                    err_code='ASGI_REQUIRED'
+                )
+            pairs = parse_pairs(request.GET.get('pairs'))
+            table = await AsyncCurrencyService().aget_table()
+        except CurrencyServiceException as e:
+            return JsonResponse({'detail': e.detail}, status=e.status_code,
+                                json_dumps_params=self.json_dumps_params)
+
+        response = StreamingHttpResponse(self.stream(pairs, table), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        # Иначе nginx буферизует ответ и события приходят пачками
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @staticmethod
+    async def stream(pairs: tuple, table):
+        # Начальные курсы — по таблице, с которой зарегистрирована подписка, а не по таблице из get:
+        # иначе таблица, установленная между ними, не дошла бы до клиента
+        subscription = get_rate_broadcaster().subscribe(pairs, table)
+        table = subscription.table
+        try:
+            yield sse_event('snapshot', table.fetched_at, {pair: pair_rate(table, pair) for pair in pairs})
+            while True:
+                update = await subscription.get(timeout=settings.RATES_STREAM_HEARTBEAT)
+                if update is None:
+                    yield ': keep-alive\n\n'
+                else:
+                    yield sse_event('rates', *update)
+        finally:
+            subscription.close()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -56,6 +57,7 @@ INSTALLED_APPS += [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -148,6 +150,78 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 BASE_URL = os.getenv('BASE_URL')
 API_KEY = os.getenv('API_KEY')
 
+# Пул соединений и таймауты (в секундах) клиента стороннего сервиса курсов
+PROVIDER_POOL_SIZE = int(os.getenv('PROVIDER_POOL_SIZE', 10))
+PROVIDER_CONNECT_TIMEOUT = float(os.getenv('PROVIDER_CONNECT_TIMEOUT', 3.05))
+PROVIDER_READ_TIMEOUT = float(os.getenv('PROVIDER_READ_TIMEOUT', 10))
+# Число повторов временных ошибок (429, 5xx, обрывы соединения) и множитель паузы между ними
+PROVIDER_RETRIES = int(os.getenv('PROVIDER_RETRIES', 2))
+PROVIDER_BACKOFF_FACTOR = float(os.getenv('PROVIDER_BACKOFF_FACTOR', 0.3))
+# Автомат защиты: после стольких сбоев подряд запросы к стороннему сервису приостанавливаются (0 — отключить)
+PROVIDER_BREAKER_FAILURES = int(os.getenv('PROVIDER_BREAKER_FAILURES', 5))
+# Через сколько секунд после срабатывания автомата пропускается пробный запрос
+PROVIDER_BREAKER_RESET_TIMEOUT = float(os.getenv('PROVIDER_BREAKER_RESET_TIMEOUT', 30))
+# Лимиты запросов к стороннему сервису, общие для воркеров узла (0 — без ограничения)
+PROVIDER_RATE_LIMIT_PER_MINUTE = int(os.getenv('PROVIDER_RATE_LIMIT_PER_MINUTE', 0))
+PROVIDER_QUOTA_PER_MONTH = int(os.getenv('PROVIDER_QUOTA_PER_MONTH', 0))
+# Файл счётчиков лимитов (пусто — currency_provider_budget.bin в RATES_SHARED_STORE_DIR или /dev/shm)
+PROVIDER_BUDGET_FILE = os.getenv('PROVIDER_BUDGET_FILE', '')
+
+# Базовая валюта таблицы курсов, остальные пары вычисляются как кросс-курсы
+RATES_BASE_CURRENCY = os.getenv('RATES_BASE_CURRENCY', 'USD')
+# Источники курсов в порядке приоритета (через запятую): ExchangeRateProvider — сторонний сервис,
+# StaticFileProvider — JSON-файл RATES_STATIC_FILE
+RATES_PROVIDERS = [
+    path.strip() for path in
+    os.getenv('RATES_PROVIDERS', 'api.v1.services.providers.ExchangeRateProvider').split(',') if path.strip()
+]
+RATES_STATIC_FILE = os.getenv('RATES_STATIC_FILE', '')
+# Промежуточные валюты, через которые вычисляются курсы, отсутствующие в таблице базовой валюты
+RATES_GRAPH_HUBS = [code.strip().upper() for code in os.getenv('RATES_GRAPH_HUBS', 'USD,EUR').split(',') if code.strip()]
+# Выбор пути через промежуточные валюты: cheapest (меньше переходов) или freshest (новее самая старая таблица)
+RATES_PATH_POLICY = os.getenv('RATES_PATH_POLICY', 'cheapest')
+# Период (в секундах), после которого таблица курсов загружается заново
+RATES_REFRESH_INTERVAL = int(os.getenv('RATES_REFRESH_INTERVAL', 300))
+# Максимальный возраст (в секундах) таблицы, который ещё можно отдавать, пока идёт обновление
+RATES_MAX_STALENESS = int(os.getenv('RATES_MAX_STALENESS', 3600))
+# Отдавать ли таблицу старше RATES_MAX_STALENESS с пометкой stale, если сторонний сервис недоступен (иначе — 503)
+RATES_SERVE_STALE = bool(os.environ.get("RATES_SERVE_STALE", "True") == "True")
+# Пауза (в секундах) перед повторной попыткой после неудачного фонового обновления
+RATES_REFRESH_RETRY_INTERVAL = int(os.getenv('RATES_REFRESH_RETRY_INTERVAL', 10))
+# Коэффициент вероятностного досрочного обновления таблицы (0 — отключить)
+RATES_EARLY_EXPIRY_BETA = float(os.getenv('RATES_EARLY_EXPIRY_BETA', 1.0))
+# Сколько (в секундах) воркер ждёт таблицу, которую загружает другой воркер, прежде чем загрузить её сам
+RATES_FETCH_LOCK_TIMEOUT = int(os.getenv('RATES_FETCH_LOCK_TIMEOUT', 30))
+# Максимальное число элементов в одном запросе пакетной конвертации
+RATES_BATCH_MAX_ITEMS = int(os.getenv('RATES_BATCH_MAX_ITEMS', 1000))
+# Максимальное число валютных пар в одной подписке на поток изменений курсов
+RATES_STREAM_MAX_PAIRS = int(os.getenv('RATES_STREAM_MAX_PAIRS', 100))
+# Период (в секундах), с которым поток изменений курсов отправляет keep-alive, если изменений нет
+RATES_STREAM_HEARTBEAT = int(os.getenv('RATES_STREAM_HEARTBEAT', 15))
+# Размер блока строк, который конвертируется одним векторным проходом при обработке файлов
+RATES_BULK_CHUNK_SIZE = int(os.getenv('RATES_BULK_CHUNK_SIZE', 10000))
+# Режим округления конвертированных сумм до минорных единиц валюты (имя константы модуля decimal)
+MONEY_ROUNDING = os.getenv('MONEY_ROUNDING', 'ROUND_HALF_EVEN')
+# Сбор метрик и конечная точка /metrics
+METRICS_ENABLED = bool(os.environ.get("METRICS_ENABLED", "True") == "True")
+# Папка, через которую воркеры объединяют метрики (пусто — /metrics отдаёт метрики одного воркера)
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+# Как часто (в секундах) воркер сохраняет свои метрики в METRICS_DIR
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 1))
+# Хранилище, через которое воркеры узла делятся таблицей курсов:
+# SharedMemoryRateStore (файл в /dev/shm), CacheRateStore (CACHES['default']) или LocalRateStore (без обмена)
+RATES_SHARED_STORE = os.getenv('RATES_SHARED_STORE', 'api.v1.services.shared_store.SharedMemoryRateStore')
+RATES_SHARED_STORE_DIR = os.getenv('RATES_SHARED_STORE_DIR')
+RATES_SHARED_STORE_CAPACITY = int(os.getenv('RATES_SHARED_STORE_CAPACITY', 512))
+# Сохранять ли снимки таблицы курсов в БД (прогрев после перезапуска и курсы на дату)
+RATES_SNAPSHOTS_ENABLED = bool(os.environ.get("RATES_SNAPSHOTS_ENABLED", "True") == "True")
+# Сколько дней хранить снимки таблицы курсов (0 — хранить все); более старые удаляются при сохранении нового
+RATES_SNAPSHOTS_RETENTION_DAYS = int(os.getenv('RATES_SNAPSHOTS_RETENTION_DAYS', 365))
+# max-age (в секундах) ответов по курсам за прошедшие дни: такие снимки больше не меняются
+RATES_HISTORICAL_MAX_AGE = int(os.getenv('RATES_HISTORICAL_MAX_AGE', 86400))
+# Запускать ли фоновое обновление курсов при старте приложения
+RATES_REFRESHER_ENABLED = bool(os.environ.get("RATES_REFRESHER_ENABLED", "True") == "True")
+
 REST_FRAMEWORK = {
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
@@ -173,9 +247,10 @@ SPECTACULAR_SETTINGS = {
     'RESPONSIVE_DOCS': True,
 }
 
+# Кеш на файловой системе общий для всех воркеров gunicorn в контейнере и не требует внешних сервисов
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', os.path.join(tempfile.gettempdir(), 'currency_converter_cache')),
     }
 }
\ No newline at end of file
@@ -0,0 +1,43 @@
+"""
+Облегчённый профиль настроек для воркеров, которые обслуживают только JSON API.
+
+Отличия от backend.settings: нет админки, сессий, сообщений, авторизации, django_filters и drf_spectacular,
+минимальный набор middleware, DRF отдаёт только JSON. Схема OpenAPI не строится на лету, а отдаётся
+из заранее сгенерированного файла OPENAPI_SCHEMA_FILE (см. README, раздел про облегчённый профиль).
+
+Запуск: DJANGO_SETTINGS_MODULE=backend.settings_lean gunicorn -c gunicorn.conf.py backend.wsgi:application
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, REST_FRAMEWORK
+
+INSTALLED_APPS = [
+    'rest_framework',
+    'api',
+]
+
+MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'api.urls_lean'
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': ['rest_framework.renderers.JSONRenderer'],
+    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    'DEFAULT_PERMISSION_CLASSES': [],
+    'UNAUTHENTICATED_USER': None,
+    # Декораторы extend_schema в представлениях работают и с классом схемы DRF (он загружается вместе с APIView),
+    # а генератор схем drf_spectacular не загружается
+    'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.openapi.AutoSchema',
+}
+
+# Схема OpenAPI, сгенерированная командой
+# python manage.py spectacular --settings backend.settings --format openapi-json --file openapi.json
+OPENAPI_SCHEMA_FILE = os.getenv('OPENAPI_SCHEMA_FILE', os.path.join(BASE_DIR, 'openapi.json'))
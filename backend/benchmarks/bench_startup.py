@@ -0,0 +1,140 @@
+"""
+Время запуска и память воркера для полного (backend.settings) и облегчённого (backend.settings_lean) профилей,
+без preload (каждый воркер импортирует приложение сам) и с preload (приложение и таблица курсов загружены
+в мастере до fork, затем gc.freeze(), как в gunicorn.conf.py).
+
+Для каждого воркера измеряется время до готовности (импорт Django, представлений и NumPy или только fork),
+RSS и собственная (не разделяемая с мастером и другими воркерами) память после обработки одного запроса.
+Собственная память — Private_Clean + Private_Dirty из /proc/self/smaps_rollup (только Linux).
+
+Запуск из папки backend:
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --workers 8
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROFILES = {
+    'full': 'benchmarks.settings',
+    'lean': 'benchmarks.settings_lean',
+}
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def memory() -> tuple:
+    """
+    Функция для получения памяти процесса.
+    :return: Кортеж (RSS, собственная память) в МиБ; собственная память — None, если smaps_rollup недоступен.
+    """
+    with open('/proc/self/status') as file:
+        rss = next(int(line.split()[1]) for line in file if line.startswith('VmRSS:'))
+    try:
+        with open('/proc/self/smaps_rollup') as file:
+            private = sum(int(line.split()[1]) for line in file if line.startswith(('Private_Clean:', 'Private_Dirty:')))
+    except OSError:
+        private = None
+    return rss / 1024, None if private is None else private / 1024
+
+
+def load_app():
+    """Функция для загрузки приложения так же, как это делает воркер: Django, маршруты и таблица курсов."""
+    import django
+    django.setup()
+
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.urls import get_resolver
+
+    from api.v1.services import get_rate_engine
+    from api.v1.services.currencies import CODES
+
+    get_resolver().url_patterns
+    get_rate_engine().set_table({code: 1.0 + index / 100 for index, code in enumerate(CODES)})
+    return WSGIHandler()
+
+
+def handle_request(application):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': '/api/rates/', 'QUERY_STRING': 'from=USD&to=EUR&value=100',
+        'SERVER_NAME': '127.0.0.1', 'SERVER_PORT': '80', 'HTTP_HOST': '127.0.0.1', 'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+    }
+    statuses = []
+    body = b''.join(application(environ, lambda status, headers: statuses.append(status)))
+    if not statuses[0].startswith('200'):
+        raise SystemExit(f"Запрос завершился ошибкой {statuses[0]}: {body[:200]}")
+
+
+def run(preload: bool, workers: int):
+    """Режим дочернего процесса: мастер (с preload или без) и воркеры, каждый печатает свои измерения."""
+    application = None
+    master_started = time.perf_counter()
+    if preload:
+        application = load_app()
+        gc.collect()
+        gc.freeze()
+    master_load = time.perf_counter() - master_started
+
+    pipes = []
+    for _ in range(workers):
+        read_fd, write_fd = os.pipe()
+        forked = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            app = application or load_app()
+            ready = time.perf_counter() - forked
+            handle_request(app)
+            rss, private = memory()
+            with os.fdopen(write_fd, 'w') as pipe:
+                json.dump({'ready': ready, 'rss': rss, 'private': private}, pipe)
+            os._exit(0)
+        os.close(write_fd)
+        pipes.append((pid, read_fd))
+
+    results = []
+    for pid, read_fd in pipes:
+        with os.fdopen(read_fd) as pipe:
+            results.append(json.load(pipe))
+        os.waitpid(pid, 0)
+    print(json.dumps({'master_load': master_load, 'workers': results}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--run', choices=('fresh', 'preload'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        return run(args.run == 'preload', args.workers)
+
+    print(f"{'профиль':>8} {'режим':>8} {'мастер, с':>10} {'готовность воркера, с':>22} "
+          f"{'RSS воркера, МиБ':>17} {'собственная, МиБ':>17}")
+    for profile, settings_module in PROFILES.items():
+        for mode in ('fresh', 'preload'):
+            env = {
+                **os.environ, 'DJANGO_SETTINGS_MODULE': settings_module, 'RATES_REFRESHER_ENABLED': 'False',
+                'RATES_SHARED_STORE': 'api.v1.services.shared_store.LocalRateStore', 'METRICS_DIR': '',
+            }
+            output = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_startup', '--run', mode, '--workers', str(args.workers)],
+                cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True,
+            ).stdout
+            data = json.loads(output.strip().splitlines()[-1])
+            workers = data['workers']
+            private = [worker['private'] for worker in workers if worker['private'] is not None]
+            print(f"{profile:>8} {mode:>8} {data['master_load']:>10.3f} "
+                  f"{statistics.mean(worker['ready'] for worker in workers):>22.3f} "
+                  f"{statistics.mean(worker['rss'] for worker in workers):>17.1f} "
+                  f"{statistics.mean(private) if private else float('nan'):>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Сравнение скалярной конвертации (float + round и точной с фиксированной точкой)
+и векторной (NumPy) конвертации с фиксированной точкой по таблице курсов.
+
+Запуск из папки backend:
+    python -m benchmarks.bench_vectorized
+    python -m benchmarks.bench_vectorized --sizes 10000 1000000
+"""
+import argparse
+import time
+from decimal import Decimal
+
+import django
+from django.conf import settings
+
+settings.configure(INSTALLED_APPS=['api'], RATES_REFRESHER_ENABLED=False, MONEY_ROUNDING='ROUND_HALF_EVEN')
+django.setup()
+
+import numpy as np  # noqa: E402
+
+from api.v1.services.currencies import CODES  # noqa: E402
+from api.v1.services.money import convert_amount  # noqa: E402
+from api.v1.services.rate_table import RateTable  # noqa: E402
+from api.v1.services.vectorized import VectorConverter  # noqa: E402
+
+
+def make_table(rng) -> RateTable:
+    rates = {code: float(rng.uniform(0.01, 20000)) for code in CODES}
+    rates['USD'] = 1.0
+    return RateTable(base='USD', rates=rates, fetched_at=time.time())
+
+
+def scalar_float(table, items):
+    cross_rate = table.cross_rate
+    return [round(cross_rate(f, t) * float(v), 2) for f, t, v in items]
+
+
+def scalar_fixed(table, items):
+    return [convert_amount(table, f, t, v) for f, t, v in items]
+
+
+def measure(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    table = make_table(rng)
+    converter = VectorConverter(table)
+
+    print(f"{'rows':>10} {'float+round, s':>15} {'fixed scalar, s':>16} {'fixed vector, s':>16} "
+          f"{'vector rows/s':>14} {'vs float+round':>15}")
+    for size in args.sizes:
+        from_indices = rng.integers(0, len(CODES), size).tolist()
+        to_indices = rng.integers(0, len(CODES), size).tolist()
+        cents = rng.integers(0, 10_000_000, size).tolist()
+        items = [(CODES[f], CODES[t], Decimal(c).scaleb(-2)) for f, t, c in zip(from_indices, to_indices, cents)]
+
+        _, float_time = measure(scalar_float, table, items)
+        expected, fixed_time = measure(scalar_fixed, table, items)
+        result, vector_time = measure(converter.convert_items, items)
+
+        if result != expected:
+            raise SystemExit(f"Результаты скалярной и векторной конвертации различаются ({size} строк)")
+
+        print(f"{size:>10} {float_time:>15.3f} {fixed_time:>16.3f} {vector_time:>16.3f} "
+              f"{size / vector_time:>14,.0f} {float_time / vector_time:>14.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,174 @@
+"""
+Локальная заглушка стороннего сервиса курсов (формат ExchangeRate-API) для работы без сети.
+
+Отвечает на /{api_key}/pair/{from}/{to} и /{api_key}/latest/{base}, умеет добавлять задержку,
+ошибки 500 и ответы 429 с заданной вероятностью. Счётчики запросов доступны на GET /__stats,
+сбрасываются POST /__reset.
+
+Запуск из папки backend:
+    python -m benchmarks.fake_provider --port 8765 --latency 0.05 --error-rate 0.01 --rate-limit-rate 0.01
+и BASE_URL=http://127.0.0.1:8765 в настройках сервиса.
+"""
+import argparse
+import collections
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import django
+from django.conf import settings
+
+
+def make_rates(seed: int = 0) -> dict:
+    """
+    Функция для построения стабильной таблицы курсов относительно USD.
+    :param seed: Зерно генератора, чтобы курсы совпадали между запусками.
+    :return: Словарь {код валюты: курс к USD}.
+    """
+    # Импорт здесь, а не в начале модуля: пакет сервисов требует настроенного Django (см. main)
+    from api.v1.services.currencies import CODES
+
+    rng = random.Random(seed)
+    rates = {code: float(f'{rng.uniform(0.05, 20000):.6g}') for code in CODES}
+    rates['USD'] = 1.0
+    return rates
+
+
+class FakeProvider(ThreadingHTTPServer):
+    """
+    HTTP-сервер заглушки.
+
+    Атрибуты:
+    - rates: Таблица курсов относительно USD.
+    - latency: Задержка ответа в секундах (плюс случайная добавка до jitter секунд).
+    - error_rate: Доля запросов, на которые отвечаем 500.
+    - rate_limit_rate: Доля запросов, на которые отвечаем 429 с заголовком Retry-After.
+    - stats: Счётчик запросов по ключам '{endpoint} {status}'.
+    """
+    daemon_threads = True
+
+    def __init__(self, address: tuple, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: int = 1, seed: int = 0):
+        super().__init__(address, FakeProviderHandler)
+        self.rates = make_rates(seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.stats = collections.Counter()
+        self._stats_lock = threading.Lock()
+
+    def count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def snapshot(self) -> dict:
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def reset(self):
+        with self._stats_lock:
+            self.stats.clear()
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if self.path == '/__stats':
+            return self._send(200, server.snapshot())
+
+        parts = self.path.strip('/').split('/')
+        endpoint = parts[1] if len(parts) > 1 else ''
+        if server.latency or server.jitter:
+            time.sleep(server.latency + random.random() * server.jitter)
+
+        roll = random.random()
+        if roll < server.rate_limit_rate:
+            server.count(f'{endpoint} 429')
+            return self._send(429, {'result': 'error', 'error-type': 'quota-reached'},
+                              headers={'Retry-After': str(server.retry_after)})
+        if roll < server.rate_limit_rate + server.error_rate:
+            server.count(f'{endpoint} 500')
+            return self._send(500, {'result': 'error', 'error-type': 'internal-error'})
+
+        rates = server.rates
+        if endpoint == 'latest' and len(parts) == 3 and parts[2] in rates:
+            base = rates[parts[2]]
+            body = {
+                'result': 'success',
+                'base_code': parts[2],
+                'time_last_update_unix': int(time.time()),
+                'conversion_rates': {code: rate / base for code, rate in rates.items()},
+            }
+        elif endpoint == 'pair' and len(parts) == 4 and parts[2] in rates and parts[3] in rates:
+            body = {
+                'result': 'success',
+                'base_code': parts[2],
+                'target_code': parts[3],
+                'conversion_rate': rates[parts[3]] / rates[parts[2]],
+            }
+        else:
+            server.count(f'{endpoint} 404')
+            return self._send(404, {'result': 'error', 'error-type': 'unsupported-code'})
+
+        server.count(f'{endpoint} 200')
+        self._send(200, body)
+
+    def do_POST(self):
+        if self.path != '/__reset':
+            return self._send(404, {})
+        self.server.reset()
+        self._send(200, {})
+
+    def _send(self, status_code: int, body: dict, headers: dict = None):
+        data = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='Задержка ответа, с.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Случайная добавка к задержке, с.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов 500.')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Доля ответов 429.')
+    parser.add_argument('--retry-after', type=int, default=1, help='Заголовок Retry-After ответов 429, с.')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Заглушке из приложения нужны только коды валют, поэтому без DJANGO_SETTINGS_MODULE хватает минимальных настроек
+    if not os.environ.get('DJANGO_SETTINGS_MODULE'):
+        settings.configure(INSTALLED_APPS=['api'], RATES_REFRESHER_ENABLED=False)
+    django.setup()
+
+    server = FakeProvider(
+        (args.host, args.port), latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate, retry_after=args.retry_after, seed=args.seed,
+    )
+    print(f"Fake provider listening on http://{args.host}:{server.server_port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,198 @@
+"""
+Нагрузочный тест GET /api/rates/ (синхронный) и /api/rates/async/ без сети.
+
+Запускает заглушку стороннего сервиса (benchmarks.fake_provider) и сервис под uvicorn или gunicorn,
+затем для каждой конечной точки и каждого уровня параллельности гоняет запросы заданное время
+и печатает RPS, задержки p50/p99, ошибки и число обращений к стороннему сервису.
+Доля запросов, обслуженных без обращения к стороннему сервису, — это доля попаданий в кеш.
+
+Запуск из папки backend:
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --endpoints sync async --concurrency 1 16 64 --duration 10 --workers 4
+    python -m benchmarks.loadtest --latency 0.2 --error-rate 0.05 --rate-limit-rate 0.05
+    python -m benchmarks.loadtest --server gunicorn --workers 4 --threads 8 --endpoints sync
+
+Запущенный отдельно сервис можно нагрузить, передав --url и --provider-url.
+"""
+import argparse
+import asyncio
+import collections
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+ENDPOINTS = {
+    'sync': '/api/rates/',
+    'async': '/api/rates/async/',
+}
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Пары для запросов: популярные валюты, чтобы нагрузка была похожа на реальную
+CURRENCIES = ('USD', 'EUR', 'GBP', 'JPY', 'CNY', 'RUB', 'CHF', 'KWD', 'INR', 'BRL')
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_ready(url: str, process: subprocess.Popen, timeout: float = 30.0):
+    """Ожидание, пока процесс начнёт отвечать на url."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Процесс завершился с кодом {process.returncode}: {' '.join(process.args)}")
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise SystemExit(f"{url} не ответил за {timeout} с")
+
+
+def start_provider(args) -> tuple:
+    port = free_port()
+    command = [
+        sys.executable, '-m', 'benchmarks.fake_provider', '--port', str(port),
+        '--latency', str(args.latency), '--jitter', str(args.jitter),
+        '--error-rate', str(args.error_rate), '--rate-limit-rate', str(args.rate_limit_rate),
+    ]
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    wait_ready(f'{url}/__stats', process)
+    return process, url
+
+
+def start_server(args, provider_url: str, state_dir: str) -> tuple:
+    port = free_port()
+    if args.server == 'gunicorn':
+        command = [
+            sys.executable, '-m', 'gunicorn', 'backend.wsgi:application', '--bind', f'127.0.0.1:{port}',
+            '--workers', str(args.workers), '--threads', str(args.threads), '--log-level', 'warning',
+        ]
+    else:
+        command = [
+            sys.executable, '-m', 'uvicorn', 'backend.asgi:application', '--port', str(port),
+            '--workers', str(args.workers), '--log-level', 'warning', '--no-access-log',
+        ]
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='benchmarks.settings',
+        BASE_URL=provider_url,
+        # Отдельные кеш и общее хранилище, чтобы каждый запуск начинался без таблицы курсов
+        CACHE_LOCATION=os.path.join(state_dir, 'cache'),
+        RATES_SHARED_STORE_DIR=state_dir,
+    )
+    process = subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+    url = f'http://127.0.0.1:{port}'
+    wait_ready(f'{url}/api/currencies/', process)
+    return process, url
+
+
+async def run_load(url: str, path: str, concurrency: int, duration: float) -> tuple:
+    """
+    Функция для отправки запросов из concurrency параллельных клиентов в течение duration секунд.
+    :return: Кортеж (массив задержек в секундах, счётчик статусов ответов, фактическая длительность).
+    """
+    latencies = []
+    statuses = collections.Counter()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        started = time.perf_counter()
+        deadline = started + duration
+
+        async def worker(seed: int):
+            rng = random.Random(seed)
+            while time.perf_counter() < deadline:
+                params = {
+                    'from': rng.choice(CURRENCIES),
+                    'to': rng.choice(CURRENCIES),
+                    'value': f'{rng.uniform(1, 100000):.2f}',
+                }
+                request_started = time.perf_counter()
+                try:
+                    response = await client.get(path, params=params)
+                    statuses[response.status_code] += 1
+                except httpx.TransportError:
+                    statuses['error'] += 1
+                latencies.append(time.perf_counter() - request_started)
+
+        await asyncio.gather(*(worker(seed) for seed in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return np.array(latencies), statuses, elapsed
+
+
+def upstream_calls(provider_url: str) -> collections.Counter:
+    return collections.Counter(httpx.get(f'{provider_url}/__stats').json())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--endpoints', nargs='+', choices=sorted(ENDPOINTS), default=['sync', 'async'])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 16, 64])
+    parser.add_argument('--duration', type=float, default=5.0, help='Длительность прогона, с.')
+    parser.add_argument('--server', choices=('uvicorn', 'gunicorn'), default='uvicorn')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=4, help='Потоков на воркер gunicorn.')
+    parser.add_argument('--latency', type=float, default=0.05, help='Задержка заглушки, с.')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Случайная добавка к задержке заглушки, с.')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Доля ответов 500 заглушки.')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Доля ответов 429 заглушки.')
+    parser.add_argument('--url', help='Адрес уже запущенного сервиса (заглушка и сервер не запускаются).')
+    parser.add_argument('--provider-url', help='Адрес заглушки уже запущенного сервиса (для счётчиков).')
+    args = parser.parse_args()
+
+    processes = []
+    with tempfile.TemporaryDirectory(prefix='currency_converter_loadtest_') as state_dir:
+        try:
+            if args.url:
+                url, provider_url = args.url.rstrip('/'), args.provider_url
+            else:
+                provider, provider_url = start_provider(args)
+                processes.append(provider)
+                server, url = start_server(args, provider_url, state_dir)
+                processes.append(server)
+
+            print(f"{'endpoint':>8} {'conc':>5} {'requests':>9} {'rps':>9} {'p50, ms':>8} {'p99, ms':>8} "
+                  f"{'max, ms':>8} {'non-2xx':>8} {'upstream':>9} {'up 429/5xx':>10} {'hit rate':>9}")
+            for endpoint in args.endpoints:
+                for concurrency in args.concurrency:
+                    before = upstream_calls(provider_url) if provider_url else collections.Counter()
+                    latencies, statuses, elapsed = asyncio.run(
+                        run_load(url, ENDPOINTS[endpoint], concurrency, args.duration)
+                    )
+                    after = upstream_calls(provider_url) if provider_url else collections.Counter()
+                    calls = after - before
+
+                    requests_count = len(latencies)
+                    failed = sum(count for status, count in statuses.items() if status == 'error' or status >= 300)
+                    upstream = sum(calls.values())
+                    upstream_failed = sum(count for key, count in calls.items() if not key.endswith(' 200'))
+                    hit_rate = 1 - min(upstream, requests_count) / requests_count if requests_count else 0.0
+                    p50, p99 = np.percentile(latencies, [50, 99]) * 1000 if requests_count else (0.0, 0.0)
+
+                    print(f"{endpoint:>8} {concurrency:>5} {requests_count:>9} {requests_count / elapsed:>9,.0f} "
+                          f"{p50:>8.1f} {p99:>8.1f} {latencies.max(initial=0) * 1000:>8.1f} {failed:>8} "
+                          f"{upstream if provider_url else '-':>9} {upstream_failed if provider_url else '-':>10} "
+                          f"{hit_rate if provider_url else float('nan'):>9.2%}")
+        finally:
+            for process in reversed(processes):
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+
+if __name__ == '__main__':
+    main()
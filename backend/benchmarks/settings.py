@@ -0,0 +1,24 @@
+"""
+Настройки Django для нагрузочного теста: БД SQLite во временной папке, сторонний сервис — заглушка
+benchmarks.fake_provider (BASE_URL задаёт benchmarks.loadtest).
+"""
+import os
+import tempfile
+
+os.environ.setdefault('SECRET_KEY', 'benchmarks')
+os.environ.setdefault('ALLOWED_HOSTS', '127.0.0.1 localhost')
+os.environ.setdefault('BASE_URL', 'http://127.0.0.1:8765')
+os.environ.setdefault('API_KEY', 'benchmarks')
+os.environ.setdefault('LANGUAGE_CODE', 'ru')
+os.environ.setdefault('TIME_ZONE', 'UTC')
+
+from backend.settings import *  # noqa: E402,F401,F403
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(tempfile.gettempdir(), 'currency_converter_benchmarks.sqlite3'),
+    }
+}
+# Снимки курсов пишутся в БД; в нагрузочном тесте они не нужны
+RATES_SNAPSHOTS_ENABLED = False
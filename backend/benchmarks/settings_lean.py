@@ -0,0 +1,7 @@
+"""Облегчённый профиль (backend.settings_lean) с теми же БД и переменными окружения, что у benchmarks.settings."""
+from benchmarks import settings as benchmarks_settings
+
+from backend.settings_lean import *  # noqa: E402,F401,F403
+
+DATABASES = benchmarks_settings.DATABASES
+RATES_SNAPSHOTS_ENABLED = benchmarks_settings.RATES_SNAPSHOTS_ENABLED
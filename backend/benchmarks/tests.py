@@ -0,0 +1,52 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from api.v1.services.circuit_breaker import CircuitBreaker
+from api.v1.services.currencies import CODES
+from api.v1.services.exceptions import CurrencyServiceException
+from api.v1.services.provider import ExchangeRateClient
+from api.v1.services.rate_budget import RequestBudget
+from benchmarks.fake_provider import FakeProvider
+
+
+class FakeProviderTests(SimpleTestCase):
+    """
+    Заглушка стороннего сервиса в уже настроенном процессе (импорт модуля не должен трогать settings)
+    и разбор её ответов настоящим клиентом.
+    """
+
+    def start_provider(self, **kwargs) -> FakeProvider:
+        server = FakeProvider(('127.0.0.1', 0), **kwargs)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join)
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def make_client(self, server: FakeProvider) -> ExchangeRateClient:
+        # Свои автомат защиты и бюджет без лимитов, чтобы тест не зависел от общего состояния процесса
+        client = ExchangeRateClient(
+            base_url=f'http://127.0.0.1:{server.server_port}', api_key='test', retries=0,
+            breaker=CircuitBreaker(), budget=RequestBudget(per_minute=0, per_month=0),
+        )
+        self.addCleanup(client.close)
+        return client
+
+    def test_latest_parses_with_client(self):
+        server = self.start_provider()
+        rates = self.make_client(server).latest('EUR')
+
+        self.assertEqual(set(rates), set(CODES))
+        self.assertEqual(rates['EUR'], 1.0)
+        self.assertAlmostEqual(rates['USD'], 1 / server.rates['EUR'])
+        self.assertEqual(server.snapshot(), {'latest 200': 1})
+
+    def test_rate_limited_response(self):
+        server = self.start_provider(rate_limit_rate=1.0)
+
+        with self.assertRaises(CurrencyServiceException) as context:
+            self.make_client(server).latest('USD')
+        self.assertEqual(context.exception.status_code, 429)
+        self.assertEqual(server.snapshot(), {'latest 429': 1})
@@ -12,8 +12,11 @@ then
 fi
 
 #python3 manage.py flush --no-input
-python3 manage.py migrate
-python3 manage.py collectstatic --no-input --clear
+# Служебные команды выполняются с полными настройками: облегчённый профиль (backend.settings_lean)
+# не содержит staticfiles и drf_spectacular
+python3 manage.py migrate --settings=backend.settings
+python3 manage.py collectstatic --no-input --clear --settings=backend.settings
+python3 manage.py spectacular --format openapi-json --file openapi.json --settings=backend.settings
 
 
 exec "$@"
\ No newline at end of file
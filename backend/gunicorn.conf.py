@@ -0,0 +1,68 @@
+"""
+Настройки gunicorn.
+
+С preload_app приложение (Django, представления, NumPy, таблица курсов из общего хранилища или снимка в БД)
+загружается один раз в мастер-процессе, а воркеры получают его через fork: импорт не повторяется в каждом
+воркере, а страницы памяти с модулями и таблицей курсов общие (copy-on-write). gc.freeze() переносит
+загруженные объекты в постоянное поколение, чтобы сборщик мусора воркеров не обходил их и не копировал страницы.
+
+Запуск из папки backend:
+    gunicorn -c gunicorn.conf.py backend.wsgi:application
+    DJANGO_SETTINGS_MODULE=backend.settings_lean gunicorn -c gunicorn.conf.py backend.wsgi:application
+"""
+import gc
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8001')
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+preload_app = bool(os.environ.get('GUNICORN_PRELOAD', 'True') == 'True')
+
+# Фоновое обновление курсов запускается в каждом воркере после fork, а не в мастере: потоки не переживают fork,
+# а блокировки, которые поток мастера держал бы в момент fork, остались бы занятыми в воркерах
+refresher_enabled = bool(os.environ.get('RATES_REFRESHER_ENABLED', 'True') == 'True')
+if preload_app:
+    os.environ['RATES_REFRESHER_ENABLED'] = 'False'
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+
+    from django.db import connections
+    from django.urls import get_resolver
+
+    from api.v1.services import get_rate_engine
+
+    # Импорт представлений и загрузка таблицы курсов до fork, чтобы воркеры разделяли их с мастером
+    get_resolver().url_patterns
+    get_rate_engine().warm_up()
+    connections.close_all()
+
+    gc.collect()
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    if preload_app and refresher_enabled:
+        from api.v1.services import start_rate_refresher
+        start_rate_refresher()
+
+
+def child_exit(server, worker):
+    import django
+    from django.apps import apps
+    from django.conf import settings
+
+    # Метрики завершившегося воркера переносятся в архив METRICS_DIR, чтобы файлы по PID не копились.
+    # METRICS_DIR может задаваться в .env, поэтому читается из настроек Django, как в воркерах
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    if not settings.METRICS_DIR:
+        return
+    if not apps.ready:
+        # Без preload_app мастер не загружает Django до первого завершения воркера
+        django.setup()
+
+    from api.v1.services.metrics import REGISTRY
+    REGISTRY.mark_process_dead(worker.pid)